@@ -0,0 +1,88 @@
+# Copyright 2024 iiPython
+# Datastore benchmark: compares allocating the previous dict-backed Datastore
+# against the slotted xpp.core.datastore classes, in bytes and time per instance.
+#
+# Usage: python benchmarks/datastore.py
+
+# Modules
+import sys
+import tracemalloc
+from pathlib import Path
+from timeit import Timer
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from xpp import Interpreter  # noqa: E402
+from xpp.core.sections import Section  # noqa: E402
+from xpp.core.datastore import (  # noqa: E402
+    Datastore, VariableDatastore, classify, parse_number,
+    KIND_NUMBER, KIND_VARIABLE, KIND_OUTPUT
+)
+
+# Previous implementation
+class LegacyDatastore(object):
+    def __init__(self, mem, raw: str, kind: int = None) -> None:
+        self.mem, self.raw, self.id_ = mem, raw, raw.lstrip("@?")
+        self.kind = classify(raw) if kind is None else kind
+
+        # Handle variables
+        last_stack = self.mem.interpreter.stack[-1]
+        self.last_stack = last_stack
+        self.store = last_stack.module.globals if self.raw[0] == "@" else last_stack.locals
+
+        # Load value
+        self.refresh()
+
+    def _parse(self):
+        if self.kind == KIND_NUMBER:
+            return parse_number(self.raw)
+
+        elif self.kind in (KIND_VARIABLE, KIND_OUTPUT):
+            self.refresh = self.refreshv
+            return self.refresh()
+
+    def refresh(self):
+        self.value = self._parse()
+        return self.value
+
+    def refreshv(self):
+        self.value = self.store.get(self.id_)
+        return self.value
+
+# Setup
+interpreter = Interpreter("main.xpp", [{"sid": "main.main", "path": "main.xpp", "lines": [], "start": 1, "args": []}], use_cache = False)
+section = Section.from_template(interpreter.sections["main.main"])
+section.initialize(interpreter.memory)
+section.locals["x"] = 5
+interpreter.stack.append(section)
+
+cases = [
+    ("variable", "x", LegacyDatastore, VariableDatastore),
+    ("number", "12", LegacyDatastore, Datastore)
+]
+
+# Benchmark
+def measure_bytes(factory, raw: str, count: int = 10_000) -> float:
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    instances = [factory(interpreter.memory, raw, classify(raw)) for _ in range(count)]  # noqa: F841
+    usage = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(start, "filename"))
+    tracemalloc.stop()
+    return usage / count
+
+def measure_time(factory, raw: str, number: int = 200_000) -> float:
+    kind = classify(raw)
+    return min(Timer(lambda: factory(interpreter.memory, raw, kind)).repeat(3, number)) / number
+
+def main() -> None:
+    print(f"{'case':>10}  {'legacy':>16}  {'current':>16}  {'legacy':>10}  {'current':>10}  {'speedup':>8}")
+    for name, raw, legacy, current in cases:
+        legacy_bytes, current_bytes = measure_bytes(legacy, raw), measure_bytes(current, raw)
+        legacy_time, current_time = measure_time(legacy, raw), measure_time(current, raw)
+        print(
+            f"{name:>10}  {legacy_bytes:>10.0f} bytes  {current_bytes:>10.0f} bytes  "
+            f"{legacy_time * 1e9:>8.0f}ns  {current_time * 1e9:>8.0f}ns  {legacy_time / current_time:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Copyright 2024 iiPython
+# Tokenizer benchmark: compares the previous per-character tokenizer
+# against xpp.core.tokenizer on lines from 10 characters up to 1 MB.
+#
+# Usage: python benchmarks/tokenizer.py
+
+# Modules
+import sys
+import json
+from pathlib import Path
+from timeit import Timer
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from xpp.core.tokenizer import tokenize, block_ends, block_starts  # noqa: E402
+from xpp.exceptions import InvalidSyntax  # noqa: E402
+
+# Previous implementation
+def legacy_tokenize(line: str) -> list:
+    dt = {"mode": None, "depth": 0, "val": "", "tokens": []}
+    for char in line:
+        dt["val"] += char
+        if dt["mode"] is not None and char == block_ends[block_starts.index(dt["mode"])]:
+            if dt["depth"] > 1:
+                dt["depth"] -= 1
+
+            else:
+                if char == block_ends[0]:
+                    dt["tokens"].append(dt["val"])
+                    dt["val"] = ""
+
+                dt["mode"] = None
+                dt["depth"] = 0
+
+        elif char in block_starts:
+            if not dt["depth"]:
+                dt["mode"] = char
+
+            if char == dt["mode"]:
+                dt["depth"] += 1
+
+        elif dt["mode"] is None and char == " ":
+            if dt["val"] == char:
+                dt["val"] = ""
+                continue  # Skip the space, it's just a seperator
+
+            dt["val"] = dt["val"][:-1]  # :-1 to account for space
+            if dt["val"] == "::":
+                dt["val"] = ""
+                break  # This is an in-line comment
+
+            dt["tokens"].append(dt["val"])
+            dt["val"] = ""
+
+    if dt["val"]:
+        if dt["mode"] is not None:
+            closing_tag = block_ends[block_starts.index(dt["mode"])]
+            if not dt["val"][-1].endswith(closing_tag):
+                raise InvalidSyntax(f"expected a closing '{closing_tag}', found nothing.")
+
+        dt["tokens"].append(dt["val"])
+        dt["val"] = ""
+
+    if dt["depth"] > 0:
+        raise InvalidSyntax(f"unexpected depth value after tokenizing, did you close all open blocks?\nRaw token information: {json.dumps(dt, indent = 4)}")
+
+    return dt["tokens"]
+
+# Sample lines
+samples = ["\"lorem ipsum $(x)\"", "(a + b)", "{ prt 1 }", "?out", "12"]
+
+def make_line(size: int) -> str:
+    tokens, length = ["add"], 3
+    while length < size:
+        tokens.append(samples[len(tokens) % len(samples)])
+        length += len(tokens[-1]) + 1
+
+    return " ".join(tokens)
+
+def make_literal(size: int) -> str:
+    return f"prt \"{'a' * (size - 6)}\""
+
+# Benchmark
+def measure(function, line: str, size: int) -> float:
+    number = max(1, 100_000 // size)
+    return min(Timer(lambda: function(line)).repeat(1 if size >= 100_000 else 3, number)) / number
+
+def main() -> None:
+    for name, builder in [("many short tokens", make_line), ("one string literal", make_literal)]:
+        print(f"{name}:\n{'size':>10}  {'legacy':>12}  {'current':>12}  {'speedup':>8}")
+        for size in [10, 100, 1_000, 10_000, 100_000, 1_000_000]:
+            line = builder(size)
+            assert legacy_tokenize(line) == tokenize(line)
+
+            legacy, current = measure(legacy_tokenize, line, size), measure(tokenize, line, size)
+            print(f"{size:>10}  {legacy * 1e6:>10.1f}us  {current * 1e6:>10.1f}us  {legacy / current:>7.1f}x")
+
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -20,15 +20,23 @@ class FakeDatastore():
         if isinstance(self.value, bool):
             self.value = not self.value
 
+    def compile(self) -> FunctionType:
+        return self.refresh
+
 class FakeSection():
     def __init__(self) -> None:
         self.active = True
         self.return_value = []
 
+class FakeInstruction():
+    def __init__(self, call: FunctionType) -> None:
+        self.call = call
+
 class FakeInterpreter():
     def __init__(self) -> None:
         self.stack = [FakeSection()]
         self.recently_executed = []
+        self.operators = {}
 
     def execute(self, data: Any) -> None:
         if data == "_RAISE":
@@ -36,6 +44,12 @@ class FakeInterpreter():
 
         self.recently_executed.append(data)
 
+    def compile(self, data: Any) -> FakeInstruction:
+        return FakeInstruction(lambda: self.execute(data))
+
+    def count_iterations(self, iterations: int) -> None:
+        pass
+
     def run_section(self, section: str, args: List[Any]) -> List[Any]:
         return args
 
@@ -0,0 +1,49 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import os
+import json
+
+import pytest
+
+from xpp.extra import batch
+
+# Begin test definitions
+def test_run_many(tmp_path):
+    (tmp_path / "greet.xpp").write_text("read ?name\nprt \"hi\" name\nexit 3")
+    (tmp_path / "spin.xpp").write_text("var x 1\nwhl (x > 0) { inc x }")
+    (tmp_path / "bad.xpp").write_text("prt \"before\"\njmp nowhere")
+
+    files = batch.expand([str(tmp_path / "g*.xpp"), str(tmp_path / "spin.xpp"), str(tmp_path / "bad.xpp")])
+    results = batch.run_many(files, workers = 2, timeout = 0.2)
+    assert [os.path.basename(result["file"]) for result in results] == ["greet.xpp", "spin.xpp", "bad.xpp"]
+    assert [result["status"] for result in results] == ["failed", "timeout", "failed"]
+    assert "EOFError" in results[0]["stderr"] and "timed out" in results[1]["stderr"]
+    assert results[2]["stdout"] == "before\n" and "UnknownSection" in results[2]["stderr"]
+    assert [result["error"].split(":")[0] for result in results] == ["EOFError", "timed out after 0.2 second(s)", "UnknownSection"]
+
+    # A worker that timed out still runs the next job it's given
+    results = batch.run_many([str(tmp_path / "spin.xpp"), str(tmp_path / "bad.xpp")], workers = 1, timeout = 0.2)
+    assert [result["status"] for result in results] == ["timeout", "failed"]
+    assert results[1]["stdout"] == "before\n"
+
+    results = batch.run_many([files[0]], ["bob\n", "mary jane\n"], workers = 1)
+    assert [result["stdout"] for result in results] == ["hi bob\n", "hi mary jane\n"]
+
+    with pytest.raises(FileNotFoundError):
+        batch.expand([str(tmp_path / "missing*.xpp")])
+
+def test_run_many_cli(tmp_path, capsys):
+    (tmp_path / "greet.xpp").write_text("read ?name\nprt \"hi\" name")
+    (tmp_path / "names.txt").write_text("bob\n\n'mary jane'\n")
+    output = tmp_path / "results.json"
+    batch.main([str(tmp_path / "greet.xpp")], {"inputs": str(tmp_path / "names.txt"), "workers": "2", "json": str(output)})
+
+    captured = capsys.readouterr()
+    assert "hi bob\n" in captured.out and "hi mary jane\n" in captured.out
+    assert "2 ok, 0 failed, 0 timed out" in captured.err
+    assert [result["input"] for result in json.loads(output.read_text())] == ["bob\n", "mary jane\n"]
+
+    for values in ({"workers": "0"}, {"engine": "missing"}, {"jit": "soon"}):
+        with pytest.raises(SystemExit):
+            batch.main([str(tmp_path / "greet.xpp")], values)
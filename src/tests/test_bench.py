@@ -0,0 +1,29 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import json
+
+from xpp.extra import bench
+
+# Begin test definitions
+def test_run_suite(tmp_path, capsys):
+    (tmp_path / "loop.xpp").write_text("var i 0\nwhl (i < 3) { inc i }\nprt i")
+    (tmp_path / "_helper.xpp").write_text("prt \"not a benchmark\"")
+
+    results = bench.run_suite(str(tmp_path), warmup = 0, repeat = 3)
+    assert list(results["benchmarks"]) == ["loop"]
+
+    result = results["benchmarks"]["loop"]
+    assert len(result["times"]) == 3 and result["min"] <= result["median"] <= result["p95"]
+    assert result["operators"] == 6  # var, whl, 3x inc, prt
+    assert capsys.readouterr().out == ""
+
+def test_bench_cli(tmp_path, capsys):
+    (tmp_path / "hello.xpp").write_text("prt \"hello\"")
+    output = tmp_path / "results.json"
+    bench.main([str(tmp_path)], {"repeat": "2", "json": str(output)})
+    bench.main([str(tmp_path)], {"repeat": "1", "compare": str(output)})
+
+    report = capsys.readouterr().out.splitlines()
+    assert report[1].startswith("hello") and report[-1].endswith("%")
+    assert json.loads(output.read_text())["benchmarks"]["hello"]["operators"] == 1
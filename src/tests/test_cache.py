@@ -0,0 +1,84 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import os
+
+import pytest
+
+from xpp import Interpreter
+from xpp.exceptions import InvalidSyntax
+from xpp.core.cache import LRUCache, ParseCache
+from xpp.modules.simpleeval import simple_eval, expression_cache
+
+# Begin test definitions
+def test_lru_hits():
+    cache, built = LRUCache(4), []
+    for _ in range(3):
+        assert cache.get("prt 1", lambda k: built.append(k) or k.split(" ")) == ["prt", "1"]
+
+    assert built == ["prt 1"]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.get("a", str.upper)
+    cache.get("b", str.upper)
+    cache.get("a", str.upper)  # Touch 'a' so 'b' is the oldest
+    cache.get("c", str.upper)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert len(cache) == 2
+
+def test_parse_cache(tmp_path):
+    source_path = tmp_path / "main.xpp"
+    source_path.write_text("prt 1")
+
+    cache = ParseCache()
+    assert cache.load(str(source_path), "main") is None
+
+    cache.store(str(source_path), "main", [{"sid": "main.main", "lines": ["prt 1"]}], {"prt 1": ["prt", "1"]})
+    assert cache.load(str(source_path), "main") == ([{"sid": "main.main", "lines": ["prt 1"]}], {"prt 1": ["prt", "1"]})
+
+    # Same size and mtime, different content
+    stat = os.stat(source_path)
+    source_path.write_text("prt 2")
+    os.utime(source_path, ns = (stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.load(str(source_path), "main") is None
+    assert (cache.hits, cache.misses, cache.writes) == (1, 2, 1)
+
+def test_parse_cache_modes(tmp_path):
+    path = tmp_path / "main.xpp"
+    path.write_text("prt 1\n:a\n    ret \\")
+
+    # Lazy loads never parse the body, eager ones have to fail on it every time
+    for _ in range(2):
+        Interpreter(str(path), [], lazy = True).load_file(str(path))
+        with pytest.raises(InvalidSyntax):
+            Interpreter(str(path), []).load_file(str(path))
+
+    path.write_text("prt 1\n:a\n    ret 2")
+    Interpreter(str(path), []).load_file(str(path))
+    lazy = Interpreter(str(path), [], lazy = True)
+    lazy.load_file(str(path))
+    assert (lazy.parse_cache.hits, lazy.parse_cache.misses) == (0, 1)
+    assert not lazy.sections["main.a"].parsed
+
+    eager = Interpreter(str(path), [])
+    eager.load_file(str(path))
+    assert eager.parse_cache.hits == 1 and eager.sections["main.a"].parsed
+
+def test_parse_cache_size(tmp_path, monkeypatch):
+    path = tmp_path / "main.xpp"
+    path.write_text("prt 1\n" * 8)
+    monkeypatch.setattr(ParseCache, "max_size", 16)
+
+    # Files this big are streamed, without priming tokens or writing a cache
+    interpreter = Interpreter(str(path), [])
+    interpreter.load_file(str(path))
+    assert not (tmp_path / ParseCache.folder).exists()
+    assert len(interpreter.token_cache) == 0 and interpreter.parse_cache.stats()["misses"] == 0
+
+def test_expression_cache():
+    hits = expression_cache.hits
+    assert [simple_eval("a < 3", names = {"a": a}) for a in range(5)] == [True] * 3 + [False] * 2
+    assert expression_cache.hits - hits >= 4 and "a < 3" in expression_cache
+    assert simple_eval("1 + 2") == 3
@@ -0,0 +1,52 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import pytest
+
+from xpp.exceptions import UnknownOperator
+from xpp.core.datastore import (
+    Datastore, VariableDatastore,
+    KIND_NUMBER, KIND_STRING, KIND_VARIABLE,
+    KIND_OUTPUT, KIND_EXPRESSION, KIND_BLOCK
+)
+from xpp.core.sections import SectionTemplate
+from xpp.core.compiler import compile_line, compile_section
+
+from . import FakeMemory
+
+# Initialization
+operators = {"prt": print}
+
+# Begin test definitions
+def test_compile_line():
+    instruction = compile_line("prt 5 \"hi\" x ?y (x + 1) { prt 1 }", operators)
+    assert instruction.operator is print
+    assert [a.kind for a in instruction.args] == [
+        KIND_NUMBER, KIND_STRING, KIND_VARIABLE,
+        KIND_OUTPUT, KIND_EXPRESSION, KIND_BLOCK
+    ]
+    assert instruction.args[4].index == range(17, 22)
+
+def test_compile_unknown_operator():
+    instruction = compile_line("nop 1", operators)
+    with pytest.raises(UnknownOperator):
+        instruction.operator(FakeMemory(), [])
+
+def test_compile_section_lines():
+    code = compile_section(
+        SectionTemplate("main.main", "main.xpp", ["prt 1", 2, "prt 2", "prt 3"], 1, []),
+        lambda line: compile_line(line, operators)
+    )
+    assert code.lines == (1, 4, 5)
+    assert [i.source for i in code.instructions] == ["prt 1", "prt 2", "prt 3"]
+
+def test_compile_constants():
+    instruction = compile_line("prt 1.5 \"a\\tb\" \"$(x)\" x", operators, memory = object())
+    assert [a.constant.value for a in instruction.args[:2]] == [1.5, "a\tb"]
+    assert instruction.args[2].constant is None and instruction.args[3].constant is None
+    assert compile_line("prt 1", operators).args[0].constant is None
+
+def test_compile_factories():
+    instruction = compile_line("prt x ?y (x) @z", operators)
+    assert [a.factory for a in instruction.args] == [VariableDatastore, VariableDatastore, Datastore, VariableDatastore]
+    assert not hasattr(VariableDatastore.__new__(VariableDatastore), "__dict__")
@@ -0,0 +1,56 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import io
+from pathlib import Path
+
+import pytest
+
+from xpp import Interpreter
+from xpp.exceptions import UnknownSection
+
+# Begin test definitions
+def test_run_source() -> None:
+    stdout = io.StringIO()
+    interpreter = Interpreter("main.xpp", [], stdout = stdout, stdin = io.StringIO("bob\n"))
+    assert interpreter.run_source("read \"name? \" ?name\nprt \"hi\" name\nret name 5") == ["bob", 5]
+    assert stdout.getvalue() == "name? hi bob\n"
+
+    with pytest.raises(EOFError):
+        interpreter.run_source("read ?name")
+
+def test_runs_are_isolated() -> None:
+    interpreter = Interpreter("main.xpp", [], stdout = io.StringIO())
+    assert interpreter.run_source("var @seen 1\nret @seen") == [1]
+    assert interpreter.run_source("ret @seen") == [None]
+
+    # New source replaces the namespace, identical source reuses what was compiled
+    interpreter.run_source(":double n\nret (n * 2)\njmp double 21 ?x\nret x")
+    code = interpreter.compiled["main.double"]
+    assert interpreter.run_source(":double n\nret (n * 2)\njmp double 21 ?x\nret x") == [42]
+    assert interpreter.compiled["main.double"] is code
+    with pytest.raises(UnknownSection):
+        interpreter.run_source("jmp double 1")
+
+def test_run_file(tmp_path: Path) -> None:
+    (tmp_path / "_helper.xpp").write_text(":triple n\nret (n * 3)\n")
+    path = tmp_path / "rule.xpp"
+    path.write_text("imp \"./_helper\"\njmp _helper.triple 4 ?x\nprt x\nret x\n")
+
+    stdout = io.StringIO()
+    interpreter = Interpreter(str(path), [], use_cache = False, stdout = stdout)
+    assert [interpreter.run_file(str(path)) for _ in range(3)] == [[12]] * 3
+    assert stdout.getvalue() == "12\n" * 3
+
+    # Edited files are picked up on the next run
+    path.write_text("ret \"changed\"\n")
+    assert interpreter.run_file(str(path)) == ["changed"]
+
+@pytest.mark.parametrize("jit", [0, 1])
+def test_jit_stdout(jit: int) -> None:
+    stdout = io.StringIO()
+    interpreter = Interpreter("main.xpp", [], jit = jit, stdout = stdout)
+    for _ in range(3):
+        interpreter.run_source(":show n\nprt n\nret\nrep 2 \"jmp show 7\"")
+
+    assert stdout.getvalue() == "7\n" * 6
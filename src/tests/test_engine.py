@@ -0,0 +1,64 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import gc
+import io
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from xpp import Interpreter
+
+# Initialization
+tutorials = Path(__file__).parents[2] / "docs" / "tutorials"
+answers = {"calculator.md": "12\n3\nA\n"}  # Everything else asks for a name and an age
+examples = [
+    (f"{path.name}:{index}", block, answers.get(path.name, "Bob\n20\n"))
+    for path in sorted(tutorials.glob("*.md"))
+    for index, block in enumerate(re.findall(r"```xpp\n(.*?)```", path.read_text(), re.S))
+]
+
+# Handle running
+def run_example(tmp_path, monkeypatch, capsys, source: str, stdin: str, engine: str, **kwargs) -> str:
+    path = tmp_path / f"{engine}.xpp"
+    path.write_text(source)
+    monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+
+    interpreter = Interpreter(str(path), [], use_cache = False, engine = engine, **kwargs)
+    try:
+        interpreter.load_file(str(path))
+        interpreter.run_section("main")
+
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}")
+
+    return capsys.readouterr().out
+
+# Begin test definitions
+@pytest.mark.parametrize("source, stdin", [e[1:] for e in examples], ids = [e[0] for e in examples])
+def test_tutorials_match(tmp_path, monkeypatch, capsys, source, stdin):
+    assert run_example(tmp_path, monkeypatch, capsys, source, stdin, "standard") == \
+        run_example(tmp_path, monkeypatch, capsys, source, stdin, "closure")
+
+@pytest.mark.parametrize("source, stdin", [e[1:] for e in examples], ids = [e[0] for e in examples])
+def test_tutorials_match_jit(tmp_path, monkeypatch, capsys, source, stdin):
+    assert run_example(tmp_path, monkeypatch, capsys, source, stdin, "standard") == \
+        run_example(tmp_path, monkeypatch, capsys, source, stdin, "standard", jit = 1)
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        Interpreter("main.xpp", [], engine = "missing")
+
+def test_dropped_instructions_are_freed():
+    interpreter = Interpreter("main.xpp", [])
+    gc.collect()
+    gc.disable()
+    try:
+        interpreter.compile("prt x")
+        interpreter.instruction_cache.clear()
+        assert gc.collect() == 0  # No reference cycle, so refcounting already freed it
+
+    finally:
+        gc.enable()
@@ -0,0 +1,203 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import io
+import os
+
+import pytest
+
+from xpp import Interpreter
+from xpp.exceptions import InvalidSection, UnknownOperator
+from xpp.core.sections import SectionRegistry, load_sections, index_sections, iter_sections
+
+# Handle running
+def run_source(tmp_path, source: str, **kwargs) -> Interpreter:
+    path = tmp_path / "main.xpp"
+    path.write_text(source)
+
+    interpreter = Interpreter(str(path), [], use_cache = False, **kwargs)
+    interpreter.load_file(str(path))
+    interpreter.run_section("main")
+    return interpreter
+
+# Begin test definitions
+def test_run_program(tmp_path, capsys):
+    run_source(tmp_path, "\n".join([
+        "var i 0",
+        "whl (i < 3) { inc i }",
+        "jmp double i ?out",
+        "prt \"result: $(out)\"",
+        "",
+        ":double n",
+        "    mul n 2 ?n",
+        "    ret n"
+    ]))
+    assert capsys.readouterr().out == "result: 6\n"
+
+def test_section_registry():
+    registry = SectionRegistry([{"sid": "main.main", "path": "main.xpp", "lines": [], "start": 1, "args": []}])
+    registry += [
+        {"sid": "main.a", "path": "main.xpp", "lines": ["ret"], "start": 2, "args": ["x"]},
+        {"sid": "main.a", "path": "other.xpp", "lines": ["ret"], "start": 9, "args": []}
+    ]
+    assert len(registry) == 2 and "main.a" in registry
+    assert registry["main.a"].args == ("x",) and registry["main.a"].start == 2
+
+    # Iterating still works for code written against the old list of dicts
+    assert [s["sid"] for s in registry] == ["main.main", "main.a"]
+    assert dict(registry["main.a"]) == {"sid": "main.a", "path": os.path.abspath("main.xpp"), "lines": ("ret",), "start": 2, "args": ("x",)}
+    assert registry["main.a"].get("body") is None
+
+def test_lazy_sections(tmp_path, capsys):
+    source = "\n".join([
+        "jmp used",
+        "",
+        ":used",
+        "    prt \"used\"",
+        "    ret",
+        "prt \"after\"",
+        ":unused",
+        "    prt 1 \\",
+        "    2",
+        "    ret"
+    ])
+    interpreter = run_source(tmp_path, source, lazy = True)
+    assert capsys.readouterr().out == "used\nafter\n"
+    assert interpreter.sections["main.used"].parsed
+    assert not interpreter.sections["main.unused"].parsed
+    assert interpreter.sections["main.unused"].lines == ("prt 1 2", 1, "ret")
+
+def test_index_matches_load():
+    source = "prt 1\n:a x\n  prt x \\\n  ret\n\n  ret x\n:: comment\nprt 2\n:b\n  ret\n"
+    eager = {s["sid"]: s for s in load_sections(source, "main.xpp")}
+    for section in index_sections(source, "main.xpp"):
+        template = SectionRegistry([section])[section["sid"]]
+        assert template.lines == tuple(eager[section["sid"]]["lines"])
+        assert template.start == eager[section["sid"]]["start"]
+
+def test_iter_sections_stream():
+    stream = io.StringIO("prt 1\n:a\n  ret\nprt 2\n")
+    assert [s["sid"] for s in iter_sections(stream, "main.xpp")] == ["main.a", "main.main"]
+
+def test_constant_set(tmp_path, capsys):
+    interpreter = run_source(tmp_path, "var x 0\nwhl (x < 3) { inc x }\nvar 5 1\nprt x 5")
+    assert capsys.readouterr().out == "3 5\n"
+    assert interpreter.compile("inc 5").args[0].constant.value == 5
+
+def test_string_templates(tmp_path, capsys):
+    run_source(tmp_path, "var x 5\nvar y \"\\\\t$(x)\"\nprt \"a\\t$(x) $(x)$(add x 1)\" \"$(y)\"")
+    assert capsys.readouterr().out == "a\t5 56 \t5\n"
+
+    # Every occurrence of a repeated placeholder runs, and they all show the first result
+    run_source(tmp_path, "var x 1\nprt \"$(inc x) $(inc x) $(x) $(x)\"\nprt x")
+    assert capsys.readouterr().out == "  3 3\n3\n"
+
+def test_nested_expressions(tmp_path, capsys):
+    run_source(tmp_path, "\n".join([
+        "new list ?l",
+        "psh l 3",
+        "var q \"it's \\\"q\\\"\"",
+        "if ((str q) == q) { prt \"quoted\" }",
+        "new list ?m",
+        "psh m l",
+        "if ((get m 0) == l) { prt \"list\" }",
+        "prt ((len q) + (len q))"
+    ]))
+    assert capsys.readouterr().out == "quoted\nlist\n16\n"
+
+def test_recursive_frames(tmp_path, capsys):
+    interpreter = run_source(tmp_path, "\n".join([
+        "var @calls 0",
+        "jmp fib 10 ?r",
+        "evl \"print(sorted(vars['scope']['main.main']))\"",
+        "prt r @calls",
+        ":fib n",
+        "    inc @calls",
+        "    if (n < 2) { ret n }",
+        "    sub n 1 ?a",
+        "    sub n 2 ?b",
+        "    jmp fib a ?x",
+        "    jmp fib b ?y",
+        "    add x y ?z",
+        "    ret z"
+    ]))
+    assert capsys.readouterr().out == "['r']\n55 177\n"
+    assert not interpreter.stack and not interpreter.memory.modules
+
+def test_return_does_not_scan_stack(tmp_path, capsys):
+    class Stack(list):
+        def __iter__(self):
+            raise AssertionError("the call stack was scanned")
+
+    path = tmp_path / "main.xpp"
+    path.write_text("jmp down 50\nprt \"done\"\n:down n\n    if (n > 0) { jmp down (n - 1) }\n    ret")
+
+    interpreter = Interpreter(str(path), [], use_cache = False)
+    interpreter.stack = Stack()
+    interpreter.load_file(str(path))
+    interpreter.run_section("main")
+    assert capsys.readouterr().out == "done\n"
+    assert not interpreter.memory.modules
+
+def test_compiled_loops(tmp_path, capsys):
+    run_source(tmp_path, "\n".join([
+        "var s \"\"",
+        "var i 0",
+        "whl ((len s) < 3) { add s \"a\" ?s }",
+        "whl (i < 3) { inc i }",
+        "rep 2 { add s \"b\" ?s }",
+        "rep i { inc i }",
+        "prt i s"
+    ]))
+    assert capsys.readouterr().out == "6 aaabb\n"
+
+def test_failed_load(tmp_path):
+    path = tmp_path / "main.xpp"
+    path.write_text(":a\n    ret 1\n:b\n    prt 1\n:c\n    ret")
+
+    interpreter = Interpreter(str(path), [], use_cache = False)
+    with pytest.raises(InvalidSection):
+        interpreter.load_file(str(path))
+
+    assert "main.a" not in interpreter.sections
+
+    # Fixing the file loads it from scratch, instead of keeping what was parsed before the error
+    path.write_text(":a\n    ret 2\n:b\n    ret 3\njmp a ?x\njmp b ?y\nret x y")
+    interpreter.load_file(str(path))
+    assert interpreter.run_section("main") == [2, 3]
+
+def test_variables_view(tmp_path, capsys):
+    interpreter = run_source(tmp_path, "\n".join([
+        "var @g 1",
+        "var x 1",
+        "evl \"vars['scope']['main.main']['x'] = 2\"",
+        "evl \"vars['scope']['main.main'] = {'x': 3, 'y': 4}\"",
+        "evl \"vars['file'][interpreter.stack[-1].path] = {'g': 5}\"",
+        "prt x y @g",
+        "evl \"print(sorted(vars['scope']), len(vars['file']))\""
+    ]))
+    assert capsys.readouterr().out == "3 4 5\n['main.main'] 1\n"
+    assert interpreter.memory.variables is interpreter.memory.variables
+
+@pytest.mark.parametrize("jit", [0, 1])
+def test_operators_added_while_running(tmp_path, monkeypatch, capsys, jit):
+    package = tmp_path / "pkgs" / "example"
+    package.mkdir(parents = True)
+    (package / ".xconfig").write_text("{\"main\": \"example.py\"}")
+    (package / "example.py").write_text("class XOperators:\n    def some_operator(mem, args):\n        print('some_operator ran', [a.value for a in args])\n")
+
+    monkeypatch.chdir(tmp_path)
+    run_source(tmp_path, "\n".join([
+        "imp \"example\"",
+        "some_operator \"hi\" 1",
+        "jmp other",
+        ":other",
+        "    some_operator \"x\" 2",
+        "    evl \"interpreter.operators = interpreter.operators | {'foo': lambda mem, args: print('foo')}\"",
+        "    foo",
+        "    ret"
+    ]), jit = jit)
+    assert capsys.readouterr().out == "some_operator ran ['hi', 1]\nsome_operator ran ['x', 2]\nfoo\n"
+
+    with pytest.raises(UnknownOperator):
+        run_source(tmp_path, "missing_operator 1")
@@ -0,0 +1,67 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import pytest
+
+from xpp import Interpreter
+from xpp.exceptions import XPPException
+
+# Handle running
+def run_source(tmp_path, source: str, **kwargs) -> Interpreter:
+    path = tmp_path / "main.xpp"
+    path.write_text(source)
+
+    interpreter = Interpreter(str(path), [], use_cache = False, **kwargs)
+    interpreter.load_file(str(path))
+    interpreter.run_section("main")
+    return interpreter
+
+# Begin test definitions
+def test_hot_sections(tmp_path, capsys):
+    source = "\n".join([
+        "var @total 0",
+        "rep 5 { jmp step ?s ?f }",
+        "prt @total",
+        ":step",
+        "    var i 0",
+        "    whl (i < 4) { add i 1 ?i }",
+        "    if (i == 4) { inc @total } { dec @total }",
+        "    mul i 2.0 ?f",
+        "    new list ?l",
+        "    add \"n=\" \"4\" ?s",
+        "    ret s f"
+    ])
+    run_source(tmp_path, source)
+    expected = capsys.readouterr().out
+
+    interpreter = run_source(tmp_path, source, jit = 3)
+    assert capsys.readouterr().out == expected == "5\n"
+    assert interpreter.hotness["main.step"] == 6  # Entered twice, plus the 4 loop iterations of the first call
+    assert interpreter.compiled["main.step"].native
+    assert not interpreter.compiled["main.main"].native
+
+def test_hot_loops(tmp_path, capsys):
+    interpreter = run_source(tmp_path, "jmp count\njmp count\n:count\n    var i 0\n    whl (i < 50) { inc i }\n    prt i\n    ret", jit = 20)
+    assert capsys.readouterr().out == "50\n50\n"
+    assert interpreter.compiled["main.count"].native  # Called twice, but the first call looped 50 times
+
+def test_jit_errors(tmp_path):
+    source = "jmp bad 1\njmp bad 1\n:bad n\n    var x 1\n    whl (x < y) { inc x }\n    ret"
+    with pytest.raises(Exception) as expected:
+        run_source(tmp_path, source)
+
+    with pytest.raises(Exception) as actual:
+        run_source(tmp_path, source, jit = 1)
+
+    assert type(actual.value) is type(expected.value) and str(actual.value) == str(expected.value)
+
+def test_jit_loop_errors(tmp_path):
+    source = "jmp bad 1\njmp bad 1\n:bad n\n    var x 1\n    whl (10 / (3 - x)) { inc x }\n    ret"
+    with pytest.raises(Exception) as expected:
+        run_source(tmp_path, source)
+
+    # A condition failing on a later iteration goes back through the interpreter, rather than escaping the translated code
+    with pytest.raises(XPPException) as actual:
+        run_source(tmp_path, source, jit = 1)
+
+    assert str(actual.value) == str(expected.value) == "division by zero"
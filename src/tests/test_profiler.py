@@ -0,0 +1,60 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import re
+import sys
+import subprocess
+from pathlib import Path
+
+from xpp import Interpreter
+from xpp.extra.profiler import Profiler
+
+# Begin test definitions
+def test_profiler(tmp_path, capsys):
+    path = tmp_path / "main.xpp"
+    path.write_text("\n".join([
+        "jmp fib 6 ?r",
+        "prt r",
+        ":fib n",
+        "    if (n < 2) { ret n }",
+        "    sub n 1 ?a",
+        "    sub n 2 ?b",
+        "    jmp fib a ?x",
+        "    jmp fib b ?y",
+        "    add x y ?z",
+        "    ret z"
+    ]))
+
+    interpreter = Interpreter(str(path), [], use_cache = False)
+    profiler = Profiler(interpreter)
+    profiler.attach()
+    interpreter.set_trace(lambda event: None)  # Other tracers come and go without affecting the profiler
+    interpreter.set_trace(None)
+    interpreter.load_file(str(path))
+    interpreter.run_section("main")
+    profiler.detach()
+    assert capsys.readouterr().out == "8\n" and interpreter.trace is None
+
+    # Section and line counts are exact
+    assert profiler.sections["main.main"][0] == 1 and profiler.sections["main.fib"][0] == 25
+    assert profiler.lines[("main.fib", 4, "if (n < 2) { ret n }")][0] == 25
+    assert profiler.lines[("main.fib", 9, "add x y ?z")][0] == 12
+    assert profiler.operators["ret"][0] == 25 and profiler.operators["jmp"][0] == 25
+
+    # Recursive time isn't counted twice
+    assert profiler.sections["main.fib"][1] <= profiler.sections["main.main"][1] == profiler.total
+
+    folded = profiler.collapsed().splitlines()
+    assert all(re.fullmatch(r"main\.main(;main\.fib)* \d+", line) for line in folded)
+    assert "main.main;main.fib;main.fib;main.fib;main.fib;main.fib" in profiler.stacks
+
+    report_path, folded_path = profiler.write(str(tmp_path / "main"))
+    assert open(report_path).read() == profiler.report() and "main.fib:4" in profiler.report()
+
+def test_profile_cli(tmp_path):
+    (tmp_path / "main.xpp").write_text("prt 1")
+    subprocess.run(
+        [sys.executable, "-m", "xpp", "--profile", str(tmp_path / "main.xpp")],
+        cwd = Path(__file__).parents[1], capture_output = True, check = True
+    )
+    assert (tmp_path / "main.profile.txt").is_file() and (tmp_path / "main.folded").is_file()
@@ -0,0 +1,28 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import sys
+import subprocess
+from pathlib import Path
+
+from xpp.modules.ops import opmap, registry, generate_registry, LazyOperator
+from xpp.modules.ops.stdlib.math import XOperators
+
+# Begin test definitions
+def test_registry_is_current():
+    assert registry == generate_registry()
+
+def test_lazy_operators():
+    assert all(isinstance(operator, LazyOperator) for operator in opmap.values())
+    assert opmap["add"].load() is XOperators.add
+
+def test_startup_imports():
+    modules = subprocess.run(
+        [sys.executable, "-c", "import sys, xpp.__main__; print(' '.join(sys.modules))"],
+        cwd = Path(__file__).parents[1], capture_output = True, text = True, check = True
+    ).stdout.split()
+    assert not [m for m in modules if m.startswith("xpp.modules.ops.stdlib") or m in ("xpp.core.jit", "random")]
+
+def test_public_namespace():
+    import xpp
+    assert not hasattr(xpp, "perf_counter")
@@ -0,0 +1,115 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import os
+import sys
+import time
+import subprocess
+from pathlib import Path
+
+import pytest
+
+# Initialization
+src = Path(__file__).parents[1]
+
+def client(socket: Path, *argv: str, input: str = "") -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "xpp", "--client", f"--socket={socket}", *argv],
+        cwd = src, input = input, capture_output = True, text = True, timeout = 30
+    )
+
+# Begin test definitions
+@pytest.mark.skipif(not hasattr(os, "fork"), reason = "xpp serve needs fork and Unix sockets")
+def test_serve_and_client(tmp_path: Path) -> None:
+    socket, script = tmp_path / "xpp.sock", tmp_path / "main.xpp"
+    script.write_text("read \"name? \" ?name\nprt \"hi\" name\nvar counter 1\ninc counter\nprt counter\n")
+
+    server = subprocess.Popen([sys.executable, "-m", "xpp", "serve", f"--socket={socket}"], cwd = src, stderr = subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            if socket.exists():
+                break
+
+            time.sleep(0.05)
+
+        # Every run gets its own memory, even on the same worker
+        for _ in range(2):
+            result = client(socket, str(script), input = "bob\n")
+            assert result.returncode == 0
+            assert result.stdout == "name? hi bob\n2\n"
+
+        result = client(socket, str(tmp_path / "missing.xpp"))
+        assert result.returncode == 1
+        assert "x++ Exception" in result.stderr
+
+    finally:
+        server.terminate()
+        server.wait(timeout = 10)
+
+    assert not socket.exists()
+
+def test_client_fallback(tmp_path: Path) -> None:
+    script = tmp_path / "main.xpp"
+    script.write_text("prt \"local\"\n")
+
+    result = client(tmp_path / "nobody.sock", str(script))
+    assert result.returncode == 0
+    assert result.stdout == "local\n"
+
+def test_preloaded_packages(tmp_path, monkeypatch, capsys):
+    from xpp import Interpreter
+    from xpp.core import interpreter, sections
+
+    path = tmp_path / "greet.xpp"
+    path.write_text(":hi name\n    prt \"hi\" name\n    ret")
+    sections.preload_file(str(path))
+    monkeypatch.setattr(interpreter, "iter_sections", None)  # Loading has to come from the preloaded sections
+
+    runner = Interpreter("main.xpp", [], use_cache = False)
+    runner.load_file(str(path), "people")
+    runner.run_section("people.hi", ["bob"])
+    assert capsys.readouterr().out == "hi bob\n"
+
+    # Changed files are parsed again
+    path.write_text(":hi name\n    prt \"hello\" name\n    ret\n")
+    monkeypatch.undo()
+    runner = Interpreter("main.xpp", [], use_cache = False)
+    runner.load_file(str(path))
+    runner.run_section("greet.hi", ["bob"])
+    assert capsys.readouterr().out == "hello bob\n"
+    sections.preloaded.clear()
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason = "xpp serve needs fork and Unix sockets")
+def test_untrusted_sockets(tmp_path, monkeypatch, capsys):
+    import socket
+    from xpp.extra import server
+
+    # Whatever is listening isn't run by us, so the terminal is never handed over
+    path = tmp_path / "other.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen(1)
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    try:
+        assert server.client(str(path), ["main.xpp"]) is None
+        connection, _ = listener.accept()
+        assert connection.recv(1) == b""
+        connection.close()
+
+    finally:
+        listener.close()
+
+    assert "running locally" in capsys.readouterr().err
+    monkeypatch.undo()
+
+    # Nor does serve remove files it doesn't own
+    path = tmp_path / "taken.sock"
+    path.write_text("not a socket")
+    with pytest.raises(SystemExit):
+        server.serve(str(path), None)
+
+    assert path.read_text() == "not a socket"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising = False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    assert server.default_socket() == str(tmp_path / f"xpp-{os.getuid()}" / "xpp.sock")
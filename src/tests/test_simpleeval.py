@@ -0,0 +1,25 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import pytest
+
+from xpp.modules.simpleeval import (
+    SimpleEval, NameNotDefined, InvalidExpression,
+    compile_expression, simple_eval
+)
+
+# Begin test definitions
+def test_compiled_matches_tree():
+    names = {"a": 3, "b": 0, "s": "ab"}
+    for expr in ["a + 1 < 5 and not b", "b or s", "1 < a < 3", "'a' in s", "a ^ 2", "-a % 2", "s is str"]:
+        _, function = compile_expression(expr)
+        assert function(names | {"str": "str"}) == SimpleEval(names = names | {"str": "str"}).eval(expr)
+
+def test_compiled_errors():
+    with pytest.raises(NameNotDefined):
+        simple_eval("missing + 1", names = {})
+
+    # Unsupported nodes only raise once they are actually reached
+    assert simple_eval("0 and f(1)", names = {}) == 0
+    with pytest.raises(InvalidExpression):
+        simple_eval("1 and f(1)", names = {})
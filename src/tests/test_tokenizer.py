@@ -0,0 +1,27 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import pytest
+
+from xpp.exceptions import InvalidSyntax
+from xpp.core.tokenizer import tokenize
+
+# Begin test definitions
+def test_tokenize_basic():
+    assert tokenize("prt  \"hello world\" x") == ["prt", "\"hello world\"", "x"]
+    assert tokenize("if (a == (b)) { prt \"x\" } ?out") == ["if", "(a == (b))", "{ prt \"x\" }", "?out"]
+    assert tokenize("prt (1)(2) 'a b'c") == ["prt", "(1)", "(2)", "'a b'c"]
+
+def test_tokenize_comment():
+    assert tokenize("prt 1 :: prints one") == ["prt", "1"]
+
+def test_tokenize_long_literal():
+    literal = f"\"{'x' * 1_000_000}\""
+    assert tokenize(f"prt {literal} 1") == ["prt", literal, "1"]
+
+def test_tokenize_errors():
+    with pytest.raises(InvalidSyntax, match = "expected a closing '\"'"):
+        tokenize("prt \"abc")
+
+    with pytest.raises(InvalidSyntax, match = "unexpected depth value"):
+        tokenize("prt ((a)")
@@ -0,0 +1,84 @@
+# Copyright (c) 2024 iiPython
+
+# Modules
+import pytest
+
+from xpp import Interpreter
+
+# Begin test definitions
+def test_trace_events(tmp_path, capsys):
+    path = tmp_path / "main.xpp"
+    path.write_text("jmp double 2 ?x\nprt x\n:double n\n    mul n 2 ?n\n    ret n")
+
+    events, interpreter = [], Interpreter(str(path), [], use_cache = False)
+    interpreter.load_file(str(path))
+    interpreter.set_trace(events.append)
+    interpreter.run_section("main")
+    assert capsys.readouterr().out == "4\n"
+    assert [(e.kind, e.sid, e.line, e.operator) for e in events] == [
+        ("enter", "main.main", 1, None),
+        ("line", "main.main", 1, None),
+        ("operator", "main.main", 1, "jmp"),
+        ("enter", "main.double", 4, None),
+        ("line", "main.double", 4, None),
+        ("operator", "main.double", 4, "mul"),
+        ("return", "main.double", 4, "mul"),
+        ("line", "main.double", 5, None),
+        ("operator", "main.double", 5, "ret"),
+        ("return", "main.double", 5, "ret"),
+        ("exit", "main.double", 5, None),
+        ("return", "main.main", 1, "jmp"),
+        ("line", "main.main", 2, None),
+        ("operator", "main.main", 2, "prt"),
+        ("return", "main.main", 2, "prt"),
+        ("exit", "main.main", 2, None)
+    ]
+    assert events[10].value == [4] and events[11].value == 4 and events[2].content == "jmp double 2 ?x"
+    assert all(e.path == str(path) for e in events)
+
+    # Removing the hook restores the regular execution path
+    interpreter.set_trace(None)
+    interpreter.run_section("main")
+    assert len(events) == 16 and "run_section" not in vars(interpreter)
+    assert capsys.readouterr().out == "4\n"
+
+def test_trace_errors(tmp_path):
+    path = tmp_path / "main.xpp"
+    path.write_text("jmp fail\n:fail\n    div 1 0 ?x\n    ret")
+
+    events, interpreter = [], Interpreter(str(path), [], use_cache = False)
+    interpreter.load_file(str(path))
+    interpreter.set_trace(events.append)
+    with pytest.raises(Exception):
+        interpreter.run_section("main")
+
+    # Everything that was entered is exited again
+    assert [(e.kind, e.sid, e.operator) for e in events if e.kind in ("exit", "return")] == [
+        ("return", "main.fail", "div"),
+        ("exit", "main.fail", None),
+        ("return", "main.main", "jmp"),
+        ("exit", "main.main", None)
+    ]
+
+def test_multiple_tracers(tmp_path, capsys):
+    path = tmp_path / "main.xpp"
+    path.write_text("jmp loop\njmp loop\n:loop\n    var i 0\n    whl (i < 5) { inc i }\n    ret")
+
+    interpreter = Interpreter(str(path), [], use_cache = False, jit = 1)
+    interpreter.load_file(str(path))
+    first, second = [], []
+    interpreter.add_trace(first.append)
+    interpreter.set_trace(second.append)
+    interpreter.run_section("main")
+
+    # set_trace only replaces its own callback
+    interpreter.set_trace(None)
+    interpreter.run_section("main")
+    assert len(first) == 2 * len(second) and len(second) > 0
+
+    # Nothing is translated while traced, so the trace covers every operator
+    assert sum(e.kind == "operator" and e.operator == "inc" for e in second) == 10
+    assert not interpreter.compiled["main.loop"].native
+
+    interpreter.remove_trace(first.append)
+    assert interpreter.trace is None
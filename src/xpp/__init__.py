@@ -2,6 +2,19 @@
 
 __version__ = "3.1.3"
 
+from time import perf_counter as _perf_counter  # noqa
+import_started = _perf_counter()  # Used by --startup-time
+
 from .extra.config import config  # noqa
-from .core.sections import load_sections  # noqa
-from .core.interpreter import Interpreter  # noqa
+
+# The interpreter is only imported once it's needed, keeping `xpp --client` light
+def __getattr__(name: str) -> object:
+    if name == "Interpreter":
+        from .core.interpreter import Interpreter
+        return Interpreter
+
+    elif name == "load_sections":
+        from .core.sections import load_sections
+        return load_sections
+
+    raise AttributeError(f"module 'xpp' has no attribute '{name}'")
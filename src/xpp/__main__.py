@@ -3,22 +3,30 @@
 # Modules
 import os
 import sys
-import json
-from . import (
-    __version__,
-    load_sections, config, Interpreter
-)
+from time import perf_counter
+from . import __version__, config
 
 # CLI class
 class CLI(object):
     def __init__(self) -> None:
+        from .core.engine import engines
+
         self.argv, self.vals = sys.argv[1:], {}
         self.options = [
             {"args": ["-h", "--help"], "fn": self.show_help, "desc": "Displays the help menu"},
             {"args": ["-hl", "--helplong"], "fn": self.show_help_long, "desc": "Displays a more detailed help menu"},
             {"args": ["-v", "--ver", "--version"], "fn": self.show_version, "desc": "Prints the x++ version"},
             {"args": ["-i", "--installation"], "fn": self.show_install_path, "desc": "Prints the installation path"},
-            {"args": ["-s", "--show"], "fn": self.show_module, "desc": "Provides information about an installed x++ module"}
+            {"args": ["-s", "--show"], "fn": self.show_module, "desc": "Provides information about an installed x++ module"},
+            {"args": ["--lazy"], "fn": None, "desc": "Only parses section bodies once they are first called"},
+            {"args": ["--no-cache"], "fn": None, "desc": "Disables the on-disk parse cache (__xppcache__)"},
+            {"args": ["--cache-stats"], "fn": None, "desc": "Prints parse, token and expression cache statistics after running"},
+            {"args": ["--engine=<name>"], "fn": None, "desc": f"Selects the execution engine ({', '.join(engines)})"},
+            {"args": ["--jit=<calls>"], "fn": None, "desc": "Translates sections to Python once they have been called (or looped) this many times"},
+            {"args": ["--profile"], "fn": None, "desc": "Writes a per-section, per-line and per-operator timing report next to the file after running"},
+            {"args": ["--startup-time"], "fn": None, "desc": "Prints how long each startup phase took after running"},
+            {"args": ["--client"], "fn": None, "desc": "Runs the file on a warm 'xpp serve' process, falling back to running it here"},
+            {"args": ["--socket=<path>"], "fn": None, "desc": "Sets the Unix socket used by 'xpp serve' and --client"}
         ]
         self.install_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
 
@@ -29,8 +37,23 @@ Usage:
     xpp [options] [flags] <file>
     File can be replaced by a dot ('.'), using the 'main' value of .xconfig instead
 
+    xpp bench [directory] [--warmup=<runs>] [--repeat=<runs>] [--json=<file>] [--compare=<file>]
+    Times every x++ program in a directory (./benchmarks by default)
+
+    xpp serve [--socket=<path>]
+    Keeps a warm interpreter process around for 'xpp --client <file>'
+
+    xpp run-many <files...> [--workers=<n>] [--timeout=<seconds>] [--inputs=<file>] [--json=<file>] [--quiet]
+    Runs many files (or one file per line of inputs) across a pool of worker processes
+
 See '{sys.executable} -m xpp -hl' for more detailed usage."""
 
+        # Load --name=value flags
+        for arg in self.argv:
+            if arg[:2] == "--" and "=" in arg:
+                name, value = arg[2:].split("=", 1)
+                self.vals[name] = value
+
         # Load filepath
         self.filepath = None
         if self.argv:
@@ -38,7 +61,7 @@ See '{sys.executable} -m xpp -hl' for more detailed usage."""
 
         # Handle options
         for opt in self.options:
-            if any([a in self.argv for a in opt["args"]]):
+            if opt["fn"] is not None and any([a in self.argv for a in opt["args"]]):
                 opt["fn"]()
 
     def show_help(self) -> None:
@@ -74,6 +97,7 @@ See '{sys.executable} -m xpp -hl' for more detailed usage."""
 
         metadata = {}
         if os.path.isfile(xconfig):
+            import json
             with open(xconfig, "r") as fh:
                 metadata = json.loads(fh.read())
 
@@ -85,11 +109,53 @@ Author: {metadata.get('author', 'N/A')}
 License: {metadata.get('license', 'N/A')}
 Location: {module_path}""")
 
-# Initialization
-cli = CLI()
-
 # Main handler
+def interpreter_options(argv: list, values: dict) -> dict:
+    """
+    Builds the Interpreter keyword arguments from the shared interpreter flags,
+    exiting with an x++ Exception if any of them are invalid.
+    """
+    from .core.engine import engines
+
+    if values.get("engine", "standard") not in engines:
+        sys.exit(f"x++ Exception: no such engine, expected one of: {', '.join(engines)}")
+
+    elif not values.get("jit", "0").isdigit():
+        sys.exit("x++ Exception: --jit expects a number of calls")
+
+    return {
+        "use_cache": "--no-cache" not in argv,
+        "lazy": "--lazy" in argv,
+        "engine": values.get("engine", "standard"),
+        "jit": int(values.get("jit", 0))
+    }
+
 def main() -> None:
+    from . import import_started  # Read on every call, 'xpp serve' workers reset it
+
+    started = perf_counter()
+    if "--client" in sys.argv[1:]:
+        from .extra import server
+        server.run_client(sys.argv[1:])  # Only returns if no server is listening
+
+    cli = CLI()
+    phases = {"imports": started - import_started, "cli": perf_counter() - started}
+
+    # Handle subcommands
+    if cli.argv[:1] == ["bench"]:
+        from .extra import bench
+        return bench.main(cli.argv[1:], cli.vals)
+
+    elif cli.argv[:1] == ["run-many"]:
+        from .extra import batch
+        return batch.main(cli.argv[1:], cli.vals)
+
+    elif cli.argv[:1] == ["serve"]:
+        from .extra import server
+        return server.serve(cli.vals.get("socket", server.default_socket()), main)
+
+    # Load the interpreter
+    from . import Interpreter
 
     # Load filepath
     filepath = cli.filepath
@@ -102,19 +168,44 @@ def main() -> None:
     if not os.path.isfile(filepath):
         sys.exit("x++ Exception: no such file")
 
-    # Load file content
-    with open(filepath, "r") as f:
-        data = f.read()
-
     # Run file
     from .exceptions import handle_exception
-    interpreter = Interpreter(filepath, [], config = config)
+    started = perf_counter()
+    interpreter = Interpreter(filepath, [], config = config, **interpreter_options(cli.argv, cli.vals))
+    phases["interpreter"] = perf_counter() - started
+    if "--profile" in cli.argv:
+        from .extra.profiler import Profiler
+        profiler = Profiler(interpreter)
+        profiler.attach()
+
     try:
-        interpreter.sections = load_sections(data, filepath)
+        started = perf_counter()
+        interpreter.load_file(filepath)
+        phases["load"] = perf_counter() - started
+
+        started = perf_counter()
         interpreter.run_section("main")
+        phases["run"] = perf_counter() - started
 
     except Exception as e:
         handle_exception(e, interpreter.stack)
 
+    finally:
+        if "--startup-time" in cli.argv:
+            print("x++ startup time:", file = sys.stderr)
+            for phase, elapsed in (phases | {"total": perf_counter() - import_started}).items():
+                print(f"  {phase:<12} {elapsed * 1000:>8.2f} ms", file = sys.stderr)
+
+        if "--profile" in cli.argv:
+            profiler.detach()
+            for path in profiler.write(os.path.join(os.path.dirname(os.path.abspath(filepath)), interpreter.entrypoint)):
+                print(f"x++ profile written to {path}", file = sys.stderr)
+
+        if "--cache-stats" in cli.argv:
+            from .modules.simpleeval import expression_cache
+            interpreter.parse_cache.report()
+            print(f"x++ token cache: {interpreter.token_cache.hits} hit(s), {interpreter.token_cache.misses} miss(es)", file = sys.stderr)
+            print(f"x++ expression cache: {expression_cache.hits} hit(s), {expression_cache.misses} miss(es)", file = sys.stderr)
+
 if __name__ == "__main__":  # Don't run twice from setup.py import
     main()
@@ -0,0 +1,150 @@
+# Copyright 2024 iiPython
+
+# Modules
+import os
+import sys
+import json
+import hashlib
+from typing import Any, Callable, Hashable, Tuple
+from collections import OrderedDict
+
+# LRU cache class
+class LRUCache(object):
+    """
+    x++ LRU Cache
+    Bounded mapping that evicts the least recently used entry once full.
+    """
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits, self.misses = 0, 0
+
+    def __repr__(self) -> str:
+        return f"<LRUCache size={len(self.data)} maxsize={self.maxsize} hits={self.hits} misses={self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.data
+
+    def get(self, key: Hashable, builder: Callable[[Hashable], Any]) -> Any:
+        try:
+            value = self.data[key]
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+        except KeyError:
+            self.misses += 1
+
+        value = builder(key)
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last = False)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.data), "maxsize": self.maxsize}
+
+# Parse cache class
+class ParseCache(object):
+    """
+    x++ Parse Cache
+    Stores loaded sections (and their tokens) inside an __xppcache__ folder
+    next to the source file, similar to Python's __pycache__.
+    Lazy and eager loads keep separate entries, since lazy ones hold unparsed bodies.
+    """
+    version = 2
+    folder = "__xppcache__"
+    max_size = 1 << 20  # Past this, holding every line's tokens costs more memory (and time) than parsing again
+
+    def __init__(self, enabled: bool = True, lazy: bool = False) -> None:
+        self.enabled, self.lazy = enabled, lazy
+        self.hits, self.misses, self.writes, self.errors = 0, 0, 0, 0
+
+    def __repr__(self) -> str:
+        return f"<ParseCache enabled={self.enabled} lazy={self.lazy} hits={self.hits} misses={self.misses}>"
+
+    def accepts(self, size: int) -> bool:
+        return self.enabled and size <= self.max_size
+
+    def path_for(self, filepath: str, namespace: str) -> str:
+        directory, filename = os.path.split(os.path.abspath(filepath))
+        mode = "lazy" if self.lazy else "eager"
+        return os.path.join(directory, self.folder, f"{filename.removesuffix('.xpp')}.{namespace}.{mode}.json")
+
+    @staticmethod
+    def key_for(filepath: str, digest: bool = True) -> dict:
+        stat = os.stat(filepath)
+        key = {"path": os.path.abspath(filepath), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if digest:
+            sha = hashlib.sha256()
+            with open(filepath, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    sha.update(chunk)
+
+            key["hash"] = sha.hexdigest()
+
+        return key
+
+    def load(self, filepath: str, namespace: str) -> Tuple[list, dict] | None:
+        if not self.enabled:
+            return None
+
+        try:
+            with open(self.path_for(filepath, namespace), "r") as fh:
+                data = json.loads(fh.read())
+
+            # Only hash the source if the cheap checks already pass
+            if data["version"] == self.version and data["lazy"] is self.lazy and self.key_for(filepath, False).items() <= data["key"].items() \
+                    and data["key"] == self.key_for(filepath):
+                self.hits += 1
+                return data["sections"], data["tokens"]
+
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+        self.misses += 1
+        return None
+
+    def store(self, filepath: str, namespace: str, sections: list, tokens: dict) -> None:
+        if not self.enabled:
+            return
+
+        path = self.path_for(filepath, namespace)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            with open(f"{path}.tmp", "w") as fh:
+                fh.write(json.dumps({
+                    "version": self.version,
+                    "lazy": self.lazy,
+                    "key": self.key_for(filepath),
+                    "sections": sections,
+                    "tokens": tokens
+                }))
+
+            os.replace(f"{path}.tmp", path)
+            self.writes += 1
+
+        except (OSError, TypeError, ValueError):
+            self.errors += 1  # Read-only locations just don't get cached
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "errors": self.errors}
+
+    def report(self, file = None) -> None:
+        print(
+            f"x++ parse cache: {self.hits} hit(s), {self.misses} miss(es), {self.writes} write(s), {self.errors} error(s)",
+            file = file or sys.stderr
+        )
@@ -0,0 +1,132 @@
+# Copyright 2024 iiPython
+
+# Modules
+from typing import Any, Callable, List
+
+from .tokenizer import tokenize
+from .datastore import (
+    Memory, Datastore, ConstantDatastore, VariableDatastore,
+    classify, KIND_EXPRESSION, KIND_VARIABLE, KIND_OUTPUT
+)
+from ..exceptions import UnknownOperator
+from ..modules.ops import LazyOperator
+
+# Argument class
+class Argument(object):
+    """
+    x++ Argument Class
+    A raw token paired with its pre-classified kind and its highlight range.
+    Literal arguments also carry their shared constant datastore.
+    """
+    __slots__ = ("raw", "kind", "index", "constant", "factory")
+
+    def __init__(self, raw: str, kind: int, index: range, constant: ConstantDatastore = None) -> None:
+        self.raw, self.kind, self.index, self.constant = raw, kind, index, constant
+        self.factory = VariableDatastore if kind in (KIND_VARIABLE, KIND_OUTPUT) else Datastore
+
+    def __repr__(self) -> str:
+        return f"<Argument raw='{self.raw}' kind={self.kind}>"
+
+# Instruction class
+class Instruction(object):
+    """
+    x++ Instruction Class
+    A tokenized line with its operator callable and arguments already resolved.
+    The interpreter attaches whatever its engine uses to run it as the call attribute.
+    """
+    __slots__ = ("name", "operator", "args", "source", "call")
+
+    def __init__(self, name: str, operator: Callable, args: tuple, source: str) -> None:
+        self.name, self.operator, self.args, self.source = name, operator, args, source
+        self.call = None
+
+    def __repr__(self) -> str:
+        return f"<Instruction name='{self.name}' args={len(self.args)}>"
+
+# Compiled section class
+class CompiledSection(object):
+    """
+    x++ Compiled Section Class
+    Holds the instructions of a section alongside their source line numbers.
+    Once the section is translated by the JIT, native holds the resulting function.
+    """
+    __slots__ = ("instructions", "lines", "native")
+
+    def __init__(self, instructions: tuple, lines: tuple) -> None:
+        self.instructions, self.lines = instructions, lines
+        self.native = None  # None means untried, False means it couldn't be translated
+
+# Failure handling
+def _deferred(error: Exception) -> Callable:
+    def raise_error(mem, args: list) -> None:
+        raise error
+
+    return raise_error
+
+def _unresolved(name: str, line: str, error: Exception) -> Callable:
+    def resolve(mem, args: list) -> Any:
+        interpreter = mem.interpreter
+        if name not in interpreter.operators:
+            raise error
+
+        # Added since this line was compiled (Python modules, evl), so the running section never saw it
+        from .engine import run
+        instruction = compile_line(line, interpreter.operators, interpreter.tokenize, mem)
+        return run(instruction.operator, instruction.args, mem)
+
+    return resolve
+
+# Compilation
+def compile_line(
+    line: str,
+    operators: dict,
+    tokenizer: Callable[[str], List[str]] = tokenize,
+    memory: Memory = None
+) -> Instruction:
+    """
+    Compiles a single x++ line into an instruction.
+    Errors are deferred until the instruction is actually executed, and unknown
+    operators are looked up again then, in case a Python module added them meanwhile.
+    If memory is given, literals are interned as constant datastores.
+    """
+    try:
+        tokens = tokenizer(line)
+
+    except Exception as e:
+        return Instruction(None, _deferred(e), (), line)
+
+    operator = operators.get(tokens[0])
+    if operator is None:
+        error = UnknownOperator(tokens[0], index = range(0, len(tokens[0])))
+        return Instruction(tokens[0], _unresolved(tokens[0], line, error), (), line)
+
+    elif isinstance(operator, LazyOperator):
+        operator = operator.load()
+
+    args, offset = [], len(tokens[0]) + 1
+    for token in tokens[1:]:
+        kind = classify(token)
+
+        # Ensure parenthesis aren't highlighted
+        start, length = (offset + 1, len(token) - 2) if kind == KIND_EXPRESSION else (offset, len(token))
+        constant = ConstantDatastore.from_raw(memory, token, kind) if memory is not None else None
+        args.append(Argument(token, kind, range(start, start + length), constant))
+        offset += len(token) + 1
+
+    return Instruction(tokens[0], operator, tuple(args), line)
+
+def compile_section(section: object, compiler: Callable[[str], Instruction]) -> CompiledSection:
+    """
+    Compiles every line of a section template, resolving whitespace into a line number table.
+    """
+    instructions, lines, lno = [], [], section.start
+    for line in section.lines:
+        if isinstance(line, int):  # This is whitespace
+            lno += line
+            continue
+
+        instructions.append(compiler(line))
+        lines.append(lno)
+        lno += 1
+
+    return CompiledSection(tuple(instructions), tuple(lines))
@@ -3,35 +3,236 @@
 # Modules
 import re
 import string
-from typing import Any
+from typing import Any, Callable, Iterator, List, Tuple
+from collections import ChainMap
+from collections.abc import MutableMapping
 
+from .cache import LRUCache
 from .tokenizer import tokenize, block_ends, block_starts
 
 from ..exceptions import InvalidSyntax
-from ..modules.simpleeval import simple_eval
+from ..modules.simpleeval import simple_eval, expression_cache, compile_expression
 
 # Initialization
 _FORMAT_REGEX = re.compile(r"\$\([^)]*\)")
 _NUMBER_START = string.digits + "+-"
+_OCTAL_TAIL = re.compile(r"\\[0-7]{1,2}$")
+
+# Argument kinds
+KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_OUTPUT, KIND_EXPRESSION, KIND_BLOCK = range(6)
+
+class Kind(object):
+    """
+    x++ Argument Kind Namespace
+    The KIND_ constants under dotted names, so match statements can use them as value patterns.
+    """
+    NUMBER, STRING, VARIABLE, OUTPUT = KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_OUTPUT
+    EXPRESSION, BLOCK = KIND_EXPRESSION, KIND_BLOCK
+
+def classify(raw: str) -> int:
+    """
+    Determines what kind of argument a raw token is, without evaluating it.
+    """
+    match raw[0]:
+        case "(":
+            return KIND_EXPRESSION
+
+        case "\"" | "'":
+            return KIND_STRING
+
+        case "{":
+            return KIND_BLOCK
+
+        case "?":
+            return KIND_OUTPUT
+
+    return KIND_NUMBER if raw[0] in _NUMBER_START else KIND_VARIABLE
+
+def parse_number(raw: str) -> int | float:
+    val = float(raw)
+    if val.is_integer():
+        return int(val)
+
+    return val
+
+def decode_string(value: str) -> str:
+    return value.encode("latin-1", "backslashreplace").decode("unicode-escape")
+
+def split_expression(expr: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Rewrites every nested (...) operator call in an expression into a temporary name.
+    Returns the new expression, along with the statements that are bound to each name.
+    """
+    calls, names = [], {}
+    for token in tokenize(expr):
+        if token[0] != "(" or token[-1] != ")":
+            continue
+
+        elif token[1].isdigit() or token[1] in "+-":
+            break
+
+        if token not in names:
+            names[token] = f"__xpp_{len(names)}"
+            expr = expr.replace(token, names[token])
+
+        calls.append((names[token], token[1:][:-1]))
+
+    return expr, calls
 
 # Memory class
 class Memory(object):
     def __init__(self, **kwargs) -> None:
         self.sections = {}
-        self.variables = {"file": {}, "scope": {}}
+        self.modules = {}
 
         # Garbage attributes
         [setattr(self, name, kwarg) for name, kwarg in kwargs.items()]
 
+    @property
+    def variables(self) -> dict:
+        """
+        Compatibility view of every variable, keyed the same way as before frames existed.
+        Both levels write through to the running frames, so existing code keeps working.
+        """
+        if "_variables" not in self.__dict__:
+            self._variables = {"file": FileVariables(self), "scope": ScopeVariables(self)}
+
+        return self._variables
+
+# Variable views
+class FileVariables(MutableMapping):
+    """
+    x++ File Variables Class
+    Maps a file path to the file-level (@) variables of its module frame.
+    """
+    def __init__(self, mem: Memory) -> None:
+        self.mem = mem
+
+    def __getitem__(self, path: str) -> dict:
+        return self.mem.modules[path].globals
+
+    def __setitem__(self, path: str, variables: dict) -> None:
+        if path not in self.mem.modules:
+            from .sections import ModuleFrame
+            self.mem.modules[path] = ModuleFrame(path)
+
+        self.mem.modules[path].globals = variables
+
+    def __delitem__(self, path: str) -> None:
+        del self.mem.modules[path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.mem.modules)
+
+    def __len__(self) -> int:
+        return len(self.mem.modules)
+
+class ScopeVariables(MutableMapping):
+    """
+    x++ Scope Variables Class
+    Maps a section ID to the local variables of its most recent running call.
+    """
+    def __init__(self, mem: Memory) -> None:
+        self.mem = mem
+
+    def frame(self, sid: str) -> object:
+        for section in reversed(self.mem.interpreter.stack):
+            if section.sid == sid:
+                return section
+
+        raise KeyError(sid)
+
+    def __getitem__(self, sid: str) -> dict:
+        return self.frame(sid).locals
+
+    def __setitem__(self, sid: str, variables: dict) -> None:
+        self.frame(sid).locals = variables
+
+    def __delitem__(self, sid: str) -> None:
+        self.frame(sid).locals = {}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(dict.fromkeys(section.sid for section in self.mem.interpreter.stack))
+
+    def __len__(self) -> int:
+        return len(set(section.sid for section in self.mem.interpreter.stack))
+
+# String template class
+class StringTemplate(object):
+    """
+    x++ String Template Class
+    A string literal split into its literal chunks and $(...) placeholders.
+    """
+    __slots__ = ("chunks", "decoded", "fields")
+
+    def __init__(self, value: str) -> None:
+        self.chunks = _FORMAT_REGEX.split(value)
+        self.fields = []
+        for item in _FORMAT_REGEX.findall(value):
+            text = item[2:][:-1]
+            tokens = text.split(" ")
+
+            # Plain variable references are looked up directly
+            simple = len(tokens) < 2 and tokens[0] and classify(tokens[0]) in (KIND_VARIABLE, KIND_OUTPUT)
+            self.fields.append((text, tokens[0].lstrip("@?") if simple else None, tokens[0][:1] == "@", len(tokens) < 2))
+
+        # Chunks can only be decoded ahead of time if no escape sequence spans a placeholder
+        try:
+            self.decoded = [decode_string(chunk) for chunk in self.chunks]
+            if any(chunk[-1:] == "\\" or _OCTAL_TAIL.search(chunk) for chunk in self.chunks[:-1]):
+                self.decoded = None
+
+        except UnicodeDecodeError:
+            self.decoded = None
+
+    def resolve(self, mem: Memory, field: tuple) -> Any:
+        text, id_, file, single = field
+        if id_ is not None:
+            last_stack = mem.interpreter.stack[-1]
+            store = last_stack.module.globals if file else last_stack.locals
+            if id_ in store:
+                return store[id_]
+
+        elif single:
+            obj = Datastore(mem, text)
+            if obj.id_ in obj.store:
+                return obj.value
+
+        return mem.interpreter.execute(text)
+
+    def render(self, mem: Memory) -> str:
+        results, values = {}, []
+        for field in self.fields:
+            result = self.resolve(mem, field)  # Repeated placeholders still run every time, but show the first result
+            if field[0] not in results:
+                results[field[0]] = str(result if result is not None else "")
+
+            values.append(results[field[0]])
+
+        # Values containing escapes have to be decoded along with the rest of the string
+        decode = self.decoded is None or any("\\" in value for value in values)
+        chunks = self.chunks if decode else self.decoded
+
+        result = [chunks[0]]
+        for value, chunk in zip(values, chunks[1:]):
+            result += (value, chunk)
+
+        return decode_string("".join(result)) if decode else "".join(result)
+
+_templates, _expressions = LRUCache(4096), LRUCache(4096)
+
 # Datastore class
 class Datastore(object):
-    def __init__(self, mem: Memory, raw: str) -> None:
+    __slots__ = ("mem", "raw", "id_", "kind", "last_stack", "store", "value")
+
+    def __init__(self, mem: Memory, raw: str, kind: int = None) -> None:
         self.mem, self.raw, self.id_ = mem, raw, raw.lstrip("@?")
+        self.kind = classify(raw) if kind is None else kind
 
         # Handle variables
         last_stack = self.mem.interpreter.stack[-1]
         self.last_stack = last_stack
-        self.store = self.mem.variables["file"][last_stack.path] if self.raw[0] == "@" else self.mem.variables["scope"][last_stack.sid]
+        self.store = last_stack.module.globals if self.raw[0] == "@" else last_stack.locals
 
         # Load value
         self.refresh()
@@ -40,17 +241,11 @@ class Datastore(object):
         return f"<DS value={repr(self.value)} raw='{self.raw}'>"
 
     def _parse(self) -> Any:
-        if self.raw[0] not in block_starts:
-            if self.raw[0] in _NUMBER_START:
-                val = float(self.raw)
-                if val.is_integer():
-                    return int(val)
-
-                return val
+        if self.kind == KIND_NUMBER:
+            return parse_number(self.raw)
 
-            # Handle variable
-            self.refresh = self.refreshv
-            return self.refresh()
+        elif self.kind in (KIND_VARIABLE, KIND_OUTPUT):
+            return self.store.get(self.id_)
 
         # Match statements
         if self.raw[-1] != block_ends[block_starts.index(self.raw[0])]:
@@ -69,35 +264,22 @@ class Datastore(object):
                 return statement
 
             case "\"" | "'":
-                value = self.raw[1:][:-1].replace("\\\"", "\"")
-                for item in re.findall(_FORMAT_REGEX, value):
-                    tokens, obj, reference = item[2:][:-1].split(" "), None, False
-                    if len(tokens) < 2:
-                        obj = Datastore(self.mem, tokens[0])
-                        reference = obj.id_ in obj.store
-
-                    result = self.mem.interpreter.execute(item[2:][:-1]) if not reference else obj.value
-                    value = value.replace(item, str(result if result is not None else ""))
-
-                return value.encode("latin-1", "backslashreplace").decode("unicode-escape")  # String literal
+                return _templates.get(self.raw[1:][:-1].replace("\\\"", "\""), StringTemplate).render(self.mem)
 
             case "(":
                 expr = self.raw[1:][:-1]
                 if expr.split(" ")[0] not in self.mem.interpreter.operators:
-                    for token in tokenize(expr):
-                        if token[0] != "(" or token[-1] != ")":
-                            continue
-
-                        elif token[1].isdigit() or token[1] in "+-":
-                            break
+                    expr, calls = _expressions.get(expr, split_expression)
+                    names = self.last_stack.locals
+                    if calls:
+                        results = {}
+                        for name, statement in calls:
+                            result = self.mem.interpreter.execute(statement)
+                            results.setdefault(name, result)
 
-                        new_data = self.mem.interpreter.execute(token[1:][:-1])
-                        if isinstance(new_data, str):
-                            new_data = f"\"{new_data}\""
+                        names = ChainMap(results, names)
 
-                        expr = expr.replace(token, str(new_data))
-
-                    return simple_eval(expr, names = self.mem.variables["scope"][self.last_stack.sid])
+                    return simple_eval(expr, names = names)
 
                 return self.mem.interpreter.execute(expr.replace("\\\"", "\""))
 
@@ -116,3 +298,92 @@ class Datastore(object):
     def refreshv(self) -> Any:
         self.value = self.store.get(self.id_)
         return self.value
+
+    def compile(self) -> Callable[[], Any]:
+        """
+        Returns a callable equivalent to refresh(), with expressions compiled ahead of time.
+        Loops use this so their condition isn't parsed again on every iteration.
+        """
+        if self.kind != KIND_EXPRESSION or self.raw[-1] != ")":
+            return self.refresh
+
+        expr = self.raw[1:][:-1]
+        if expr.split(" ")[0] in self.mem.interpreter.operators:
+            evaluate = self.mem.interpreter.compile(expr.replace("\\\"", "\"")).call
+
+        else:
+            expr, calls = _expressions.get(expr, split_expression)
+            if calls:
+                return self.refresh  # Calls have to run in order every time
+
+            function, names = expression_cache.get(expr, compile_expression)[1], self.last_stack.locals
+            evaluate = lambda: function(names)  # noqa: E731
+
+        def refresh() -> Any:
+            self.value = evaluate()
+            return self.value
+
+        return refresh
+
+# Variable datastore class
+class VariableDatastore(Datastore):
+    """
+    x++ Variable Datastore Class
+    A variable or output reference, which skips straight to its store on every refresh.
+    """
+    __slots__ = ()
+
+    def __init__(self, mem: Memory, raw: str, kind: int = KIND_VARIABLE) -> None:
+        self.mem, self.raw, self.id_, self.kind = mem, raw, raw.lstrip("@?"), kind
+
+        # Handle variables
+        self.last_stack = last_stack = mem.interpreter.stack[-1]
+        self.store = store = last_stack.module.globals if raw[0] == "@" else last_stack.locals
+        self.value = store.get(self.id_)
+
+    refresh = Datastore.refreshv
+
+# Constant datastore class
+class ConstantDatastore(Datastore):
+    """
+    x++ Constant Datastore Class
+    A number or plain string literal, evaluated once and shared by every execution of its line.
+    """
+    __slots__ = ()
+
+    def __init__(self, mem: Memory, raw: str, kind: int, value: Any) -> None:
+        self.mem, self.raw, self.id_, self.kind, self.value = mem, raw, raw, kind, value
+
+    @classmethod
+    def from_raw(cls, mem: Memory, raw: str, kind: int) -> "ConstantDatastore | None":
+        """
+        Pre-evaluates a literal, returning None if it isn't constant (or fails to parse).
+        Anything that fails here is left for the regular Datastore to raise at runtime.
+        """
+        try:
+            if kind == KIND_NUMBER:
+                return cls(mem, raw, kind, parse_number(raw))
+
+            elif kind == KIND_STRING and len(raw) > 1 and raw[-1] == raw[0]:
+                value = raw[1:][:-1].replace("\\\"", "\"")
+                if not _FORMAT_REGEX.search(value):
+                    return cls(mem, raw, kind, decode_string(value))
+
+        except (ValueError, UnicodeDecodeError):
+            pass
+
+        return None
+
+    @property
+    def store(self) -> dict:
+        return self.mem.interpreter.stack[-1].locals
+
+    @property
+    def last_stack(self) -> object:
+        return self.mem.interpreter.stack[-1]
+
+    def set(self, value: Any) -> None:
+        self.store[self.id_] = value  # The literal itself keeps its value
+
+    def refresh(self) -> Any:
+        return self.value
@@ -0,0 +1,98 @@
+# Copyright 2024 iiPython
+
+# Modules
+from functools import partial
+from typing import Any, Callable
+
+from .datastore import Memory, VariableDatastore
+from .compiler import Argument, Instruction
+from ..exceptions import XPPException, MiscError
+
+# Initialization
+engines = ("standard", "closure")
+
+# Argument accessors
+def _accessor(arg: Argument, mem: Memory) -> Callable[[], Any]:
+    """
+    Builds a callable returning the datastore for an argument,
+    failing with the argument's highlight range just like run does.
+    """
+    if arg.constant is not None:
+        constant = arg.constant
+        return lambda: constant
+
+    factory, raw, kind, index = arg.factory, arg.raw, arg.kind, arg.index
+    if factory is VariableDatastore:
+        return partial(factory, mem, raw, kind)  # Variable lookups can't fail while a section is running
+
+    def build() -> Any:
+        try:
+            return factory(mem, raw, kind)
+
+        except Exception as e:
+
+            # Set the exception index
+            if not isinstance(e, XPPException):
+                raise MiscError(str(e), index = index)
+
+            e.index = index
+            raise e
+
+    return build
+
+# Dispatching
+def run(operator: Callable, args: list, mem: Memory) -> Any:
+    datastores = []
+    for arg in args:
+        if arg.constant is not None:
+            datastores.append(arg.constant)
+            continue
+
+        try:
+            datastores.append(arg.factory(mem, arg.raw, arg.kind))
+
+        except Exception as e:
+
+            # Set the exception index
+            if not isinstance(e, XPPException):
+                raise MiscError(str(e), index = arg.index)
+
+            e.index = arg.index
+            raise e
+
+    return operator(mem, datastores)
+
+def dispatch(instruction: Instruction, mem: Memory) -> Callable[[], Any]:
+    """
+    Builds the standard engine's call for an instruction.
+    Only its operator and arguments are held, so the instruction doesn't reference itself
+    and is freed as soon as it's dropped from the caches.
+    """
+    return partial(run, instruction.operator, instruction.args, mem)
+
+# Threading
+def thread(instruction: Instruction, mem: Memory) -> Callable[[], Any]:
+    """
+    Compiles an instruction into a closure bound to its operator and argument accessors.
+    Calling it behaves exactly like passing the instruction's operator and arguments to run.
+    """
+    operator = instruction.operator
+    if all(arg.constant is not None for arg in instruction.args):
+        constants = tuple(arg.constant for arg in instruction.args)
+        return lambda: operator(mem, list(constants))
+
+    accessors = [_accessor(arg, mem) for arg in instruction.args]
+    match len(accessors):
+        case 1:
+            a, = accessors
+            return lambda: operator(mem, [a()])
+
+        case 2:
+            a, b = accessors
+            return lambda: operator(mem, [a(), b()])
+
+        case 3:
+            a, b, c = accessors
+            return lambda: operator(mem, [a(), b(), c()])
+
+    return lambda: operator(mem, [accessor() for accessor in accessors])
@@ -2,85 +2,358 @@
 
 # Modules
 import os
-from typing import Any, List
+from functools import partial
+from typing import Any, Callable, List, TextIO, Tuple
 
-from .sections import Section
+from .cache import LRUCache, ParseCache
+from .sections import (
+    Section, SectionRegistry, SectionTemplate,
+    iter_sections, index_sections, load_sections, load_preloaded
+)
 from .tokenizer import tokenize
 from .datastore import Memory, Datastore
-from ..exceptions import (
-    XPPException, MiscError, UnknownSection,
-    UnknownOperator, MissingParameter
-)
+from .engine import engines, dispatch, thread
+from .trace import TraceEvent
+from .compiler import Instruction, CompiledSection, compile_line, compile_section
+from ..exceptions import UnknownSection, MissingParameter
 from ..modules.ops import opmap
 
 # Interpreter class
 class Interpreter(object):
-    def __init__(self, entrypoint: str, sections: list, **kwargs) -> None:
+    def __init__(
+        self,
+        entrypoint: str,
+        sections: list,
+        cache_size: int = 4096,
+        use_cache: bool = True,
+        lazy: bool = False,
+        engine: str = "standard",
+        jit: int = 0,
+        stdout: TextIO | None = None,
+        stdin: TextIO | None = None,
+        **kwargs
+    ) -> None:
+        if engine not in engines:
+            raise ValueError(f"unknown engine '{engine}', expected one of: {', '.join(engines)}")
+
         self.entrypoint = entrypoint.split(os.sep)[-1].removesuffix(".xpp")
         self.sections = sections
 
         self.stack, self.memory = [], Memory(**{"interpreter": self} | kwargs)
+
+        # Loop bodies and branches are handed back to execute() as the same
+        # strings every iteration, so tokenize each distinct line only once
+        self.token_cache = LRUCache(cache_size)
+        self.instruction_cache = LRUCache(cache_size)
+        self.parse_cache = ParseCache(use_cache, lazy)
+        self.lazy = lazy
+        self.engine = engine
+        self.compiled = {}
+
+        # Sections entered (or looped) at least `jit` times get translated to Python on their next call
+        self.jit, self.hotness = jit, {}
+        self.trace, self.tracers, self.traced = None, [], None
         self.operators = opmap
 
-    def execute(self, line: str) -> Any:
-        tokens = tokenize(line)
-        if tokens[0] not in self.operators:
-            raise UnknownOperator(tokens[0], index = range(0, len(tokens[0])))
+        # Embedding (None means the process' own stdout and stdin)
+        self.stdout, self.stdin = stdout, stdin
+        self.loaded = {}
+
+    @property
+    def sections(self) -> SectionRegistry:
+        return self._sections
+
+    @sections.setter
+    def sections(self, sections: SectionRegistry | list) -> None:
+        self._sections = sections if isinstance(sections, SectionRegistry) else SectionRegistry(sections)
+
+    @property
+    def operators(self) -> dict:
+        return self._operators
+
+    @operators.setter
+    def operators(self, operators: dict) -> None:
+        self._operators = operators
+
+        # Compiled instructions hold their operator, so they need rebuilding
+        self.instruction_cache.clear()
+        self.compiled.clear()
+
+    def load_file(self, filepath: str, namespace: str = None) -> None:
+        """
+        Loads the sections of an x++ file into this interpreter,
+        going through the on-disk parse cache where possible.
+        Unless lazy loading is enabled, files too big for the cache are streamed line by line.
+        """
+        namespace = namespace or filepath.split(os.sep)[-1].removesuffix(".xpp")
+        stat = os.stat(filepath)
+        version = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+        if self.is_loaded(namespace, version):
+            return  # Templates never change once loaded, so they're shared between runs
+
+        preloaded = load_preloaded(filepath, namespace, stat)
+        if preloaded is not None:
+            self.sections += preloaded
+            self.loaded[namespace] = version
+            return
+
+        cacheable = self.parse_cache.accepts(stat.st_size)
+        cached = self.parse_cache.load(filepath, namespace) if cacheable else None
+        if cached is not None:
+            sections, tokens = cached
+            for section in sections:
+                section["path"] = filepath
+
+        else:
+            with open(filepath, "r") as fh:
+                if self.lazy:
+                    sections = index_sections(fh.read(), filepath, namespace)
+
+                elif not cacheable:
+                    self.sections.add(list(iter_sections(fh, filepath, namespace)))  # All or nothing on syntax errors
+                    self.loaded[namespace] = version
+                    return
+
+                else:
+                    sections = list(iter_sections(fh, filepath, namespace))
+
+            tokens = {}
+            if cacheable:
+                for line in [line for s in sections for line in s["lines"] or [] if isinstance(line, str)]:
+                    try:
+                        tokens[line] = tokenize(line)
+
+                    except Exception:
+                        continue  # Let the error surface when the line actually runs
+
+                self.parse_cache.store(filepath, namespace, sections, tokens)
+
+        for line in list(tokens)[:self.token_cache.maxsize]:
+            self.token_cache.put(line, tokens[line])
+
+        self.sections += sections
+        self.loaded[namespace] = version
+
+    def load_source(self, source: str, filepath: str = "main.xpp", namespace: str = None) -> None:
+        """
+        Loads the sections of an x++ source string, as if it had been read from filepath.
+        Loading the same source again is free, different source replaces the namespace.
+        """
+        namespace = namespace or filepath.split(os.sep)[-1].removesuffix(".xpp")
+        version = (os.path.abspath(filepath), source)
+        if self.is_loaded(namespace, version):
+            return
+
+        self.sections += (index_sections if self.lazy else load_sections)(source, filepath, namespace)
+        self.loaded[namespace] = version
+
+    def is_loaded(self, namespace: str, version: tuple) -> bool:
+        """
+        Checks if a namespace was loaded from this exact source,
+        unloading whatever it was loaded from otherwise.
+        """
+        loaded = self.loaded.get(namespace)
+        if loaded == version:
+            return True
+
+        elif loaded is not None:
+            for sid in self._sections.remove(namespace):
+                self.compiled.pop(sid, None)
+                self.hotness.pop(sid, None)
+
+            del self.loaded[namespace]
+
+        return False
 
-        # Create datastores
-        datastores = []
-        for i, t in enumerate(tokens[1:]):
-            try:
-                datastores.append(Datastore(self.memory, t))
+    # Embedding
+    def reset(self) -> None:
+        """
+        Throws away all run state (variables, the call stack and operators imported from Python),
+        while keeping loaded sections and compiled code around for the next run.
+        """
+        self.stack.clear()
+        self.memory.modules.clear()
+        self.memory.sections.clear()
+        if self._operators is not opmap:
+            self.operators = opmap
 
-            except Exception as e:
-                length = sum([len(t) + 1 for t in tokens[:i + 1]])
+    def run_file(self, filepath: str, args: List[Any] = []) -> List[Any]:
+        """
+        Resets the interpreter and runs an x++ file, returning the values of its final ret.
+        """
+        namespace = filepath.split(os.sep)[-1].removesuffix(".xpp")
+        self.reset()
+        self.load_file(filepath, namespace)
+        return self.run_section(f"{namespace}.main", args)
 
-                # Ensure parenthesis aren't highlighted
-                if t[0] == "(":
-                    length, t = length + 1, t[:-2]  # -2 instead of -1 to bypass the length addition
+    def run_source(self, source: str, filepath: str = "main.xpp", args: List[Any] = []) -> List[Any]:
+        """
+        Resets the interpreter and runs an x++ source string, returning the values of its final ret.
+        The filepath sets its namespace and where relative imports are resolved from.
+        """
+        namespace = filepath.split(os.sep)[-1].removesuffix(".xpp")
+        self.reset()
+        self.load_source(source, filepath, namespace)
+        return self.run_section(f"{namespace}.main", args)
 
-                # Set the exception index
-                if not isinstance(e, XPPException):
-                    raise MiscError(str(e), index = range(length, length + len(t)))
+    def tokenize(self, line: str) -> list:
+        return self.token_cache.get(line, tokenize)
 
-                e.index = range(length, length + len(t))
-                raise e
+    def compile(self, line: str) -> Instruction:
+        return self.instruction_cache.get(line, self.compile_uncached)
 
-        return self.operators[tokens[0]](self.memory, datastores)
+    def compile_uncached(self, line: str) -> Instruction:
+        instruction = compile_line(line, self._operators, self.tokenize, self.memory)
+        if self.engine == "closure":
+            instruction.call = thread(instruction, self.memory)
+
+        else:
+            instruction.call = dispatch(instruction, self.memory)
+
+        if self.trace is not None:
+            instruction.call = partial(self.run_traced, instruction.name, instruction.source, instruction.call)
+
+        return instruction
+
+    def compile_section(self, template: SectionTemplate) -> CompiledSection:
+        code = self.compiled.get(template.sid)
+        if code is None:
+            code = self.compiled[template.sid] = compile_section(template, self.compile_uncached)
+
+        return code
+
+    def run_traced(self, name: str, source: str, call: Callable[[], Any]) -> Any:
+        section, value = self.stack[-1], None
+        line = section.current_line
+        self.trace(TraceEvent("operator", section, line, source, name))
+        try:
+            value = call()
+            return value
+
+        finally:
+            self.trace(TraceEvent("return", section, line, source, name, value))
+
+    # Tracing
+    def set_trace(self, callback: Callable[[TraceEvent], None] | None) -> None:
+        """
+        Installs a callback that receives a TraceEvent on section enter and exit,
+        every line of a section and every operator dispatch and return.
+        It replaces the callback from an earlier set_trace call (None just removes it),
+        while callbacks added with add_trace, like the profiler's, keep running.
+        """
+        if self.traced is not None:
+            self.tracers.remove(self.traced)
+
+        self.traced = callback
+        if callback is not None:
+            self.tracers.append(callback)
+
+        self.update_trace()
+
+    def add_trace(self, callback: Callable[[TraceEvent], None]) -> None:
+        self.tracers.append(callback)
+        self.update_trace()
+
+    def remove_trace(self, callback: Callable[[TraceEvent], None]) -> None:
+        self.tracers.remove(callback)
+        self.update_trace()
+
+    def update_trace(self) -> None:
+        """
+        Points self.trace at the installed callbacks.
+        Tracing uses separate execution paths, so untraced runs pay next to nothing for it.
+        """
+        tracers, traced = list(self.tracers), self.trace is not None
+        if len(tracers) > 1:
+            self.trace = lambda event: [callback(event) for callback in tracers]
+
+        else:
+            self.trace = tracers[0] if tracers else None
+
+        # Compiled code only goes through run_traced if it was compiled while tracing
+        if traced != (self.trace is not None):
+            self.instruction_cache.clear()
+            self.compiled.clear()
+
+    def execute(self, line: str) -> Any:
+        return self.compile(line).call()
 
     def find_section(self, section: str) -> str:
         if "." not in section:
             file = self.stack[-1].path.split(os.sep)[-1].removesuffix(".xpp") if self.stack else self.entrypoint
             section = f"{file}.{section}"
 
-        if section not in [s["sid"] for s in self.sections]:
+        if section not in self._sections:
             raise UnknownSection(f"no such section: '{section}'")
 
         return section
 
-    def run_section(self, section: str, args: List[Datastore] = []) -> List[Any]:
-        section = Section(**[s for s in self.sections if s["sid"] == self.find_section(section)][0])
+    def heat(self, sid: str, code: CompiledSection) -> None:
+        self.hotness[sid] = self.hotness.get(sid, 0) + 1
+        if self.hotness[sid] >= self.jit:
+            from .jit import translate  # Scripts run without --jit never need it
+            code.native = translate(self, sid, code) or False
+
+    def count_iterations(self, iterations: int) -> None:
+        """
+        Counts loop iterations towards the running section's heat,
+        so a section that spends its time in a loop is translated on its next call.
+        """
+        if self.jit and self.stack:
+            sid = self.stack[-1].sid
+            self.hotness[sid] = self.hotness.get(sid, 0) + iterations
+
+    def enter_section(self, section: str, args: List[Datastore]) -> Tuple[Section, CompiledSection]:
+        template = self._sections[self.find_section(section)]
+        section = Section.from_template(template)
         section.initialize(self.memory)
         self.stack.append(section)
         try:
             for i, a in enumerate(section.args):
-                self.memory.variables["scope"][section.sid][a] = args[i]
+                section.locals[a] = args[i]
 
         except IndexError:
             raise MissingParameter(f"'{section.sid}' requires argument '{a}' which was not provided")
 
-        for line in section.lines:
-            section.line_content = line
-            if not section.active:
-                break
+        code = self.compile_section(template)
+        if self.jit and code.native is None and self.trace is None:  # Traces show the code that actually runs
+            self.heat(template.sid, code)
 
-            elif isinstance(line, int):  # This is whitespace
-                section.current_line += line
-                continue
+        return section, code
 
-            self.execute(line)
-            section.current_line += 1
+    def run_section(self, section: str, args: List[Datastore] = []) -> List[Any]:
+        if self.trace is not None:
+            return self.run_section_traced(section, args)
+
+        section, code = self.enter_section(section, args)
+        if code.native:
+            code.native(section)
+
+        else:
+            for instruction, line in zip(code.instructions, code.lines):
+                section.current_line, section.line_content = line, instruction.source
+                instruction.call()
+                if not section.active:
+                    break
 
         self.stack.pop()
         return section.trash()
+
+    def run_section_traced(self, section: str, args: List[Datastore] = []) -> List[Any]:
+        section, code = self.enter_section(section, args)
+        self.trace(TraceEvent("enter", section, section.start, None))
+        value = None
+        try:
+            for instruction, line in zip(code.instructions, code.lines):
+                section.current_line, section.line_content = line, instruction.source
+                self.trace(TraceEvent("line", section, line, instruction.source))
+                instruction.call()
+                if not section.active:
+                    break
+
+            self.stack.pop()
+            value = section.trash()
+            return value
+
+        finally:
+            self.trace(TraceEvent("exit", section, section.current_line, section.line_content, value = value))
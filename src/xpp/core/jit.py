@@ -0,0 +1,293 @@
+# Copyright 2024 iiPython
+
+# Modules
+import ast
+import math
+import keyword
+from typing import Any, Callable, List
+
+from .datastore import (
+    ConstantDatastore, Kind, classify, parse_number, split_expression,
+    KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_OUTPUT, KIND_EXPRESSION, KIND_BLOCK
+)
+from .compiler import CompiledSection
+from ..modules.ops import opmap
+from ..modules.simpleeval import expression_cache, compile_expression
+
+# Initialization
+_STRAIGHT = {"var", "add", "sub", "mul", "div", "pow", "inc", "dec", "prt"}  # Translated by caffeine
+_CONTROL = {"whl", "if", "rep", "ret"}  # Emitted here, to keep x++'s error behaviour
+_VALUES = (KIND_NUMBER, KIND_STRING, KIND_VARIABLE, KIND_EXPRESSION)
+_BUILTINS = {"Exception", "isinstance", "int", "range", "print"}  # Used by the generated code
+
+def _add(a: Any, b: Any) -> Any:
+    return (0 if isinstance(a, (int, float)) else "") + a + b  # Same starting value as the add operator
+
+# Name rewriting
+class _FrameRewriter(ast.NodeTransformer):
+    """
+    Points every x++ variable in caffeine's output at the running frame,
+    locals at __l and (caffeine's _GL prefixed) globals at __g.
+    """
+    def __init__(self, expressions: int) -> None:
+        self.expressions = {f"__e{i}" for i in range(expressions)}
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.expressions:
+            return ast.Call(ast.Name(node.id, ast.Load()), [ast.Name("__l", ast.Load())], [])
+
+        elif node.id[:2] == "__" or node.id in _BUILTINS:
+            return node
+
+        store, name = ("__g", node.id[3:]) if node.id[:3] == "_GL" else ("__l", node.id)
+        return ast.Subscript(ast.Name(store, ast.Load()), ast.Constant(name), node.ctx)
+
+class _AddRewriter(ast.NodeTransformer):
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if isinstance(node.op, ast.Add):
+            return ast.Call(ast.Name("__add", ast.Load()), [self.visit(node.left), self.visit(node.right)], [])
+
+        return self.generic_visit(node)
+
+# Translation class
+class Translation(object):
+    """
+    x++ JIT Translation Class
+    Stands in for caffeine's PythonFunction while a section is translated,
+    collecting the emitted Python along with the closures it relies on.
+    """
+    def __init__(self, interpreter: object) -> None:
+        self.interpreter = interpreter
+        self.lines, self.depth, self.translated = [], 2, 0
+        self.expressions, self.fallbacks = [], []
+
+        # caffeine compatibility
+        self.T, self.is_main = "", False
+
+    def append(self, line: str) -> None:
+        self.lines.append("    " * self.depth + line)
+
+    def prepend(self, line: str) -> None:
+        pass  # caffeine's global declarations aren't needed, variables live in the frame
+
+    def fallback(self, line: str) -> str:
+        self.fallbacks.append(self.interpreter.compile(line).call)
+        return f"__f{len(self.fallbacks) - 1}()"
+
+    def write(self, *values: Any) -> None:
+        print(*values, file = self.interpreter.stdout)
+
+    def value(self, raw: str, kind: int) -> str | None:
+        """
+        Returns the Python source for an argument, or None if it can't be translated exactly.
+        """
+        match kind:
+            case Kind.NUMBER:
+                try:
+                    value = parse_number(raw)
+                    return f"({value!r})" if math.isfinite(value) else None  # Parenthesized so caffeine leaves the type alone
+
+                except ValueError:
+                    return None
+
+            case Kind.STRING:
+                if ConstantDatastore.from_raw(None, raw, kind) is None or "\\" in raw or raw[0] in raw[1:][:-1]:
+                    return None
+
+                return raw
+
+            case Kind.VARIABLE | Kind.OUTPUT:
+                name = raw.lstrip("@?")
+                if not name.isidentifier() or keyword.iskeyword(name) or name[0] == "_" or name in _BUILTINS:
+                    return None
+
+                return ("?" if kind == KIND_OUTPUT else "") + ("_GL" if raw[0] == "@" else "") + name
+
+            case Kind.EXPRESSION:
+                expr = raw[1:][:-1]
+                if expr.split(" ")[0] in self.interpreter.operators:
+                    return None
+
+                try:
+                    expr, calls = split_expression(expr)
+                    if calls:
+                        return None
+
+                    self.expressions.append(expression_cache.get(expr, compile_expression)[1])
+                    return f"__e{len(self.expressions) - 1}"
+
+                except Exception:
+                    return None
+
+        return None
+
+    def body(self, raw: str) -> str | None:
+        statement = raw[1:][:-1].strip()
+        return statement if statement.split(" ")[0] in self.interpreter.operators else None
+
+    def arguments(self, tokens: List[str]) -> List[str] | None:
+        """
+        Checks that a line has a shape we translate exactly, returning its arguments if so.
+        """
+        name, args = tokens[0], tokens[1:]
+        if name not in _STRAIGHT | _CONTROL or self.interpreter.operators.get(name) is not opmap.get(name):
+            return None  # Operators replaced by Python modules are left to them
+
+        kinds = [classify(arg) for arg in args]
+        match name:
+            case "var":
+                valid = len(args) == 2 and kinds[0] == KIND_VARIABLE and kinds[1] in _VALUES
+
+            case "add" | "sub" | "mul" | "div" | "pow":
+                valid = len(args) == 3 and kinds[0] in _VALUES and kinds[1] in _VALUES and kinds[2] == KIND_OUTPUT
+
+            case "inc" | "dec":
+                valid = len(args) == 1 and kinds[0] == KIND_VARIABLE
+
+            case "prt" | "ret":
+                valid = all(kind in _VALUES for kind in kinds)
+
+            case "whl":
+                valid = kinds == [KIND_EXPRESSION, KIND_BLOCK]
+
+            case "if":
+                valid = kinds in ([KIND_EXPRESSION, KIND_BLOCK], [KIND_EXPRESSION, KIND_BLOCK, KIND_BLOCK])
+
+            case "rep":
+                valid = len(args) == 2 and kinds[0] in (KIND_NUMBER, KIND_VARIABLE) and kinds[1] == KIND_BLOCK
+
+        if not valid:
+            return None
+
+        mapped = []
+        for arg, kind in zip(args, kinds):
+            mapped.append(self.body(arg) if kind == KIND_BLOCK else self.value(arg, kind))
+            if mapped[-1] is None:
+                return None
+
+        return mapped
+
+    def nested(self, line: str) -> None:
+        self.depth += 1
+        self.convert(line, False)
+        self.depth -= 1
+
+    def guarded(self, condition: str, line: str) -> None:
+        self.append("try:")
+        self.append(f"    __c = {condition}")
+        self.append("except Exception:")
+        self.append(f"    {self.fallback(line)}  # Reproduces the interpreter's error")
+        self.append("else:")
+        self.depth += 1
+
+    def convert(self, line: str, top: bool) -> bool:
+        """
+        Emits a single x++ line, returning True if it could end the section.
+        """
+        try:
+            tokens = self.interpreter.tokenize(line)
+            args = self.arguments(tokens)
+
+        except Exception:
+            args = None
+
+        if args is None:
+            self.append(self.fallback(line))
+            return True
+
+        self.translated += 1
+        match tokens[0]:
+            case "whl":
+                self.guarded(f"{args[0]}", line)
+                self.append("while __c:")
+                self.nested(args[1])
+                self.append("    try:")
+                self.append(f"        __c = {args[0]}")
+                self.append("    except Exception:")
+                self.append("        __c = False")
+                self.append(f"        {self.fallback(line)}  # Carries on interpreted, raising the same error if it still fails")
+                self.depth -= 1
+
+            case "if":
+                self.guarded(f"{args[0]}", line)
+                self.append("if __c:")
+                self.nested(args[1])
+                if len(args) == 3:
+                    self.append("else:")
+                    self.nested(args[2])
+
+                self.depth -= 1
+
+            case "rep":
+                self.guarded(args[0], line)
+                self.append("if not isinstance(__c, int) or __c <= 0:")
+                self.append(f"    {self.fallback(line)}")
+                self.append("else:")
+                self.append("    for __r in range(__c):")
+                self.depth += 1
+                self.nested(args[1])
+                self.depth -= 2
+
+            case "ret":
+                if args:
+                    self.append("try:")
+                    self.append(f"    __s.return_value = [{', '.join(args)}]")
+                    self.append("except Exception:")
+                    self.append(f"    {self.fallback(line)}")
+
+                self.append("__s.active = False")
+                if top:
+                    self.append("return")
+
+            case _:
+                from caffeine.modules.operators import operators
+
+                self.append("try:")
+                self.depth += 1
+                start = len(self.lines)
+                operators.mapping[tokens[0]](self, args)
+                if tokens[0] == "add":
+                    for index in range(start, len(self.lines)):
+                        tree = _AddRewriter().visit(ast.parse(self.lines[index].strip()))
+                        self.lines[index] = "    " * self.depth + ast.unparse(ast.fix_missing_locations(tree))
+
+                self.depth -= 1
+                self.append("except Exception:")
+                self.append(f"    {self.fallback(line)}")
+                return False
+
+        return tokens[0] != "ret"
+
+    def build(self, code: CompiledSection, sid: str) -> Callable[[object], None] | None:
+        for instruction, line in zip(code.instructions, code.lines):
+            self.append(f"__s.current_line, __s.line_content = {line}, {instruction.source!r}")
+            if self.convert(instruction.source, True):
+                self.append("if not __s.active:")
+                self.append("    return")
+
+        if not self.translated:
+            return None
+
+        names = ["__add"] + [f"__e{i}" for i in range(len(self.expressions))] + [f"__f{i}" for i in range(len(self.fallbacks))]
+        source = "\n".join([
+            f"def __factory({', '.join(names)}):",
+            "    def __native(__s):",
+            "        __l, __g = __s.locals, __s.module.globals"
+        ] + self.lines + ["    return __native"])
+
+        tree = _FrameRewriter(len(self.expressions)).visit(ast.parse(source))
+        namespace = {"print": self.write}  # caffeine's prt prints, follow the interpreter's stdout instead
+        exec(compile(ast.fix_missing_locations(tree), f"<xpp-jit {sid}>", "exec"), namespace)
+        return namespace["__factory"](_add, *self.expressions, *self.fallbacks)
+
+# Handle translating
+def translate(interpreter: object, sid: str, code: CompiledSection) -> Callable[[object], None] | None:
+    """
+    Translates a compiled section into a native Python function taking its frame,
+    or returns None if nothing in it could be translated.
+    """
+    try:
+        return Translation(interpreter).build(code, sid)
+
+    except Exception:
+        return None  # Anything unexpected just keeps the section interpreted
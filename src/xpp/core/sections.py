@@ -2,17 +2,39 @@
 
 # Modules
 import os
-from typing import Any
+import re
+from typing import Any, Iterable, Iterator, List
 
 from .datastore import Memory
 from ..exceptions import SectionConflict, InvalidSection, InvalidSyntax
 
+# Module frame class
+class ModuleFrame(object):
+    """
+    x++ Module Frame Class
+    Holds the file-level (@) variables shared by every running section of a file,
+    along with how many of those sections are currently running.
+    """
+    __slots__ = ("path", "globals", "refs")
+
+    def __init__(self, path: str) -> None:
+        self.path, self.globals, self.refs = path, {}, 0
+
+    def __repr__(self) -> str:
+        return f"<ModuleFrame SourcePath='{self.path}' Variables={len(self.globals)}>"
+
 # Section class
 class Section(object):
     """
     x++ Section Class
     Holds all section data: id, path, lines, etc.
+    Each call gets its own section, which doubles as the frame holding its local variables.
     """
+    __slots__ = (
+        "active", "sid", "path", "lines", "start", "args", "return_value",
+        "current_line", "line_content", "template", "module", "locals", "_mem"
+    )
+
     def __init__(self, sid: str, path: str, lines: list, start: int, args: list) -> None:
         self.active = True
         self.sid = sid
@@ -24,100 +46,377 @@ class Section(object):
         self.return_value = [None]
         self.current_line = sum([i if isinstance(i, int) else 1 for i in lines]) + start - 1
         self.line_content = lines[-1] if lines else ""
+        self.template, self.module, self.locals = None, None, None
+
+    @classmethod
+    def from_template(cls, template: "SectionTemplate") -> "Section":
+        section = cls.__new__(cls)
+        section.active = True
+        section.sid, section.path, section.lines = template.sid, template.path, template.lines
+        section.start, section.args = template.start, template.args
+
+        section.return_value = [None]
+        section.current_line, section.line_content = template.end, template.last
+        section.template, section.module, section.locals = template, None, None
+        return section
 
     def __repr__(self) -> str:
         return f"<Section ID='{self.sid}' SourcePath='{self.path}' StartLine={self.start}>"
 
     def initialize(self, mem: Memory) -> None:
         self._mem = mem
-        if self.path not in self._mem.variables["file"]:
-            self._mem.variables["file"][self.path] = {}
+        self.module = mem.modules.get(self.path)
+        if self.module is None:
+            self.module = mem.modules[self.path] = ModuleFrame(self.path)
 
-        self._mem.variables["scope"][self.sid] = {}
+        self.module.refs += 1
+        self.locals = {}
         self.current_line = self.start
 
     def trash(self) -> Any:
-        if self.path in self._mem.variables["file"]:
+        # Check that this is the last running section in our file before garbage collecting
+        self.module.refs -= 1
+        if not self.module.refs:
+            if self._mem.modules.get(self.path) is self.module:
+                del self._mem.modules[self.path]
 
-            # Check that this is the last running scope in our file before garbage collecting
-            ns = self.path.replace("\\", "/").split("/")[-1].removesuffix(".xpp")
-            if [s for s in self._mem.variables["scope"] if s.split(".")[0] == ns] == [self.sid]:
-                del self._mem.variables["file"][self.path]
+        return self.return_value
 
-        if self.sid in self._mem.variables["scope"]:
-            del self._mem.variables["scope"][self.sid]
+# Section template class
+_TEMPLATE_KEYS = ("sid", "path", "lines", "start", "args")
 
-        return self.return_value
+class SectionTemplate(object):
+    """
+    x++ Section Template Class
+    The loaded form of a section that Section frames are created from.
+    Lazily indexed sections parse their body the first time it's needed.
+    """
+    __slots__ = ("sid", "path", "start", "args", "body", "final", "_lines", "_end")
+
+    def __init__(
+        self,
+        sid: str,
+        path: str,
+        lines: list | None,
+        start: int,
+        args: list,
+        body: str = None,
+        final: bool = False
+    ) -> None:
+        self.sid = sid
+        self.path = os.path.abspath(path)
+        self.start = start
+        self.args = tuple(args)
+
+        # Handle lazy sections
+        self.body, self.final = body, final
+        self._lines, self._end = None if lines is None else tuple(lines), None
+
+    def __repr__(self) -> str:
+        return f"<SectionTemplate ID='{self.sid}' SourcePath='{self.path}' StartLine={self.start}>"
+
+    @property
+    def parsed(self) -> bool:
+        return self._lines is not None
+
+    @property
+    def lines(self) -> tuple:
+        if self._lines is None:
+            self._lines = tuple(parse_body(self.body, self.sid, self.path, self.start, self.final))
+            self.body = None
+
+        return self._lines
+
+    # Precalculated frame defaults (used for errors raised before any line runs)
+    @property
+    def end(self) -> int:
+        if self._end is None:
+            self._end = sum([i if isinstance(i, int) else 1 for i in self.lines]) + self.start - 1
+
+        return self._end
+
+    @property
+    def last(self) -> str:
+        return self.lines[-1] if self.lines else ""
+
+    # Dictionary compatibility (loaded sections used to be plain dicts)
+    def __getitem__(self, key: str) -> Any:
+        if key not in _TEMPLATE_KEYS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in _TEMPLATE_KEYS else default
+
+    def keys(self) -> tuple:
+        return _TEMPLATE_KEYS
+
+# Section registry class
+class SectionRegistry(object):
+    """
+    x++ Section Registry
+    Maps section IDs to their templates, so finding a section doesn't
+    depend on how many sections are loaded.
+    """
+    def __init__(self, sections: List[dict] = []) -> None:
+        self.templates = {}
+        self.add(sections)
+
+    def __repr__(self) -> str:
+        return f"<SectionRegistry sections={len(self.templates)}>"
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def __iter__(self) -> Iterator[SectionTemplate]:
+        return iter(self.templates.values())
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self.templates
+
+    def __getitem__(self, sid: str) -> SectionTemplate:
+        return self.templates[sid]
+
+    def __iadd__(self, sections: List[dict]) -> "SectionRegistry":
+        self.add(sections)
+        return self
+
+    def add(self, sections: Iterable[dict]) -> None:
+        for section in sections:
+            if section["sid"] not in self.templates:  # The first registration wins
+                self.templates[section["sid"]] = SectionTemplate(**section)
+
+    def get(self, sid: str) -> SectionTemplate | None:
+        return self.templates.get(sid)
+
+    def remove(self, namespace: str) -> List[str]:
+        """
+        Unloads every section in a namespace, returning their IDs.
+        """
+        sids = [sid for sid in self.templates if sid.rsplit(".", 1)[0] == namespace]
+        for sid in sids:
+            del self.templates[sid]
+
+        return sids
 
 # Section loader
-def load_sections(source: str, filepath: str, namespace: str = None) -> list:
+_HEADER_REGEX = re.compile(r"^[^\S\n]*:(?!:)[^\n]*", re.M)
+_RETURN_REGEX = re.compile(r"^[^\S\n]*ret(?:[^\S\n]*| [^\n]*)$", re.M)
+_SEPARATOR_REGEX = re.compile(r"[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+
+def _process_whitespace(lines: list) -> None:
+    if lines and isinstance(lines[-1], int):
+        lines[-1] += 1
+
+    else:
+        lines.append(1)
+
+def _process_line(section: dict, line: str, last: bool) -> bool:
     """
-    Takes an x++ source file and breaks it into a list of sections.
+    Adds a stripped statement to a section, joining multiline statements.
+    Returns False if the line was merged into the previous statement.
+    """
+    lines = section["lines"]
+    if (line[-1] == "\\") and last:
+        lines.append(line)
+        raise InvalidSyntax(
+            "multiline statement found, but this is the last line!",
+            stack = [Section(**section)],
+            index = len(line) - 1
+        )
+
+    elif lines:
+        index = -1 if (not isinstance(lines[-1], int)) or (len(lines) < 2) else -2
+        if isinstance(lines[index], str) and lines[index][-1] == "\\":
+            lines[index] = lines[index][:-1] + line
+            _process_whitespace(lines)
+            return False
+
+    lines.append(line)
+    return True
+
+def _missing_return(section: dict) -> InvalidSection:
+    return InvalidSection(f"section '{section['sid']}' is missing a return statement!", stack = [Section(**section)])
+
+def _split_lines(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield from line.splitlines() or [line]  # Matches str.splitlines() on the whole source
+
+def iter_sections(lines: Iterable[str], filepath: str, namespace: str = None) -> Iterator[dict]:
+    """
+    Takes the lines of an x++ source file (eg. an open file) and yields each section as soon as it closes.
+    The global section is yielded last, once every line has been read.
     """
 
     # Calculate file name
     filename = namespace or filepath.split(os.sep)[-1].removesuffix(".xpp")
 
     # Initialization
-    data = {"sections": [{"sid": f"{filename}.main", "path": filepath, "lines": [], "start": 1, "args": []}], "active": 0}
-
-    # Split sections
-    lines = source.splitlines()
-    lcn = len(lines)
-    for lno, line in enumerate(lines):
-        def process_whitespace(lines: list) -> None:
-            if lines and isinstance(lines[-1], int):
-                lines[-1] += 1
-
-            else:
-                lines.append(1)
+    main = {"sid": f"{filename}.main", "path": filepath, "lines": [], "start": 1, "args": []}
+    section, sids = main, {main["sid"]}
 
-        line, lines = line.strip(), data["sections"][data["active"]]["lines"]
+    # Split sections (reading one line ahead to spot the last line)
+    lines = _split_lines(lines)
+    line, lno = next(lines, None), 0
+    while line is not None:
+        following = next(lines, None)
+        line = line.strip()
         if (not line) or (line[:2] == "::"):
-            process_whitespace(lines)
-            continue
+            _process_whitespace(section["lines"])
 
         elif line[0] == ":":
             sp = line.split(" ")
             sid = f"{filename}.{sp[0][1:]}"
-            if sid in [s["sid"] for s in data["sections"]]:
+            if sid in sids:
                 raise SectionConflict(f"section '{sid}' is already registered!")
 
-            elif (len(data["sections"]) > 1) and (data["sections"][-1]["lines"][-1].split(" ")[0] != "ret"):
-                raise InvalidSection(
-                    f"section '{data['sections'][-1]['sid']}' is missing a return statement!",
-                    stack = [Section(**data["sections"][-1])]
-                )
+            elif section is not main:
+                raise _missing_return(section)
+
+            section = {"sid": sid, "path": filepath, "lines": [], "start": lno + 2, "args": sp[1:]}
+            sids.add(sid)
+
+        elif _process_line(section, line, following is None) and line.split(" ")[0] == "ret":
+            if section is not main:
+                yield section
+
+            section = main
+
+        line, lno = following, lno + 1
+
+    if section is not main:
+        raise _missing_return(section)
+
+    yield main
 
-            data["sections"].append({"sid": sid, "path": filepath, "lines": [], "start": lno + 2, "args": sp[1:]})
-            data["active"] = len(data["sections"]) - 1
+def load_sections(source: str, filepath: str, namespace: str = None) -> list:
+    """
+    Takes an x++ source file and breaks it into a list of sections.
+    """
+    sections = list(iter_sections(source.splitlines(), filepath, namespace))
+    return sections[-1:] + sections[:-1]
+
+def parse_body(body: str, sid: str, path: str, start: int, final: bool = False) -> list:
+    """
+    Parses the raw body of a lazily indexed section into its lines.
+    """
+    section, lines = {"sid": sid, "path": path, "lines": [], "start": start, "args": []}, body.split("\n")
+    for lno, line in enumerate(lines):
+        line = line.strip()
+        if (not line) or (line[:2] == "::"):
+            _process_whitespace(section["lines"])
             continue
 
+        _process_line(section, line, final and lno == (len(lines) - 1))
+
+    return section["lines"]
+
+def index_sections(source: str, filepath: str, namespace: str = None) -> list:
+    """
+    Takes an x++ source file and indexes its sections without parsing their bodies.
+    Only the global section is parsed right away, the rest are parsed on first use.
+    """
+    source = source.replace("\r\n", "\n")
+    if _SEPARATOR_REGEX.search(source):
+        return load_sections(source, filepath, namespace)  # Unusual line breaks, take the slow path
+
+    filename = namespace or filepath.split(os.sep)[-1].removesuffix(".xpp")
+    main = {"sid": f"{filename}.main", "path": filepath, "lines": [], "start": 1, "args": []}
+    sections, sids = [main], {main["sid"]}
+    if not source:
+        return sections
+
+    # Line handling (text matches str.splitlines() once split on newlines)
+    text = source.removesuffix("\n")
+    lcn = text.count("\n") + 1
+
+    def process_main(lines: List[str], lno: int) -> None:
+        for offset, line in enumerate(lines):
+            line = line.strip()
+            if (not line) or (line[:2] == "::"):
+                _process_whitespace(main["lines"])
+                continue
+
+            _process_line(main, line, lno + offset == (lcn - 1))
+
+    def continues(start: int, stop: int) -> bool:
+        for line in reversed(text[start:stop].split("\n")[:-1]):
+            line = line.strip()
+            if line and line[:2] != "::":
+                return line[-1] == "\\"
+
+        return False
+
+    # Walk through the section headers
+    headers = list(_HEADER_REGEX.finditer(text))
+    position, lno = 0, 0
+    for index, header in enumerate(headers):
+        process_main(text[position:header.start()].split("\n")[:-1], lno)
+        lno += text.count("\n", position, header.start())
+
+        sp = header.group().strip().split(" ")
+        sid = f"{filename}.{sp[0][1:]}"
+        if sid in sids:
+            raise SectionConflict(f"section '{sid}' is already registered!")
+
+        # Find the return statement closing this section
+        body_start = header.end() + 1
+        region_end = headers[index + 1].start() if index + 1 < len(headers) else len(text)
+        for match in _RETURN_REGEX.finditer(text, body_start, region_end):
+            if not continues(body_start, match.start()):
+                break
+
         else:
-            lines = data["sections"][data["active"]]["lines"]
-            if (line[-1] == "\\") and (lno == (lcn - 1)):
-                lines.append(line)
-                raise InvalidSyntax(
-                    "multiline statement found, but this is the last line!",
-                    stack = [Section(**data["sections"][-1])],
-                    index = len(line) - 1
-                )
-
-            elif lines:
-                index = -1 if (not isinstance(lines[-1], int)) or (len(lines) < 2) else -2
-                if isinstance(lines[index], str) and lines[index][-1] == "\\":
-                    lines[index] = lines[index][:-1] + line
-                    process_whitespace(lines)
-                    continue
-
-            lines.append(line)
-            if line.split(" ")[0] == "ret":
-                data["active"] = 0
-
-    if data["active"] > 0:
-        raise InvalidSection(
-            f"section '{data['sections'][-1]['sid']}' is missing a return statement!",
-            stack = [Section(**data["sections"][-1])]
-        )
+            if index + 1 < len(headers):
+                next_sid = f"{filename}.{headers[index + 1].group().strip().split(' ')[0][1:]}"
+                if next_sid in sids or next_sid == sid:
+                    raise SectionConflict(f"section '{next_sid}' is already registered!")
+
+            body, final = text[body_start:region_end], region_end == len(text)
+            section = {"sid": sid, "path": filepath, "lines": [], "start": lno + 2, "args": sp[1:]}
+            if body_start <= region_end and (body or final):
+                section["lines"] = parse_body(body if final else body[:-1], sid, filepath, lno + 2, final)
+
+            raise _missing_return(section)
+
+        sids.add(sid)
+        sections.append({
+            "sid": sid, "path": filepath, "lines": None, "start": lno + 2, "args": sp[1:],
+            "body": text[body_start:match.end()], "final": match.end() == len(text)
+        })
+
+        # Anything after the return belongs to the global section
+        lno += text.count("\n", header.start(), match.end()) + 1
+        position = match.end() + 1
+
+    if position <= len(text):
+        process_main(text[position:].split("\n"), lno)
+
+    return sections
+
+# Package preloading
+preloaded = {}
+
+def preload_file(filepath: str) -> None:
+    """
+    Parses an x++ file ahead of time (eg. in 'xpp serve' before it forks),
+    so loading it later only has to check that it hasn't changed since.
+    """
+    stat = os.stat(filepath)
+    with open(filepath, "r") as fh:
+        sections = load_sections(fh.read(), filepath)
+
+    preloaded[os.path.abspath(filepath)] = (stat.st_mtime_ns, stat.st_size), filepath.split(os.sep)[-1].removesuffix(".xpp"), sections
+
+def load_preloaded(filepath: str, namespace: str, stat: os.stat_result) -> list | None:
+    """
+    Returns the preloaded sections of a file under the given namespace,
+    or None if it wasn't preloaded or has changed on disk since.
+    """
+    entry = preloaded.get(os.path.abspath(filepath))
+    if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+        return None
 
-    return data["sections"]
+    _, name, sections = entry
+    return [section | {"sid": namespace + section["sid"][len(name):], "path": filepath} for section in sections]
@@ -1,6 +1,7 @@
 # Copyright 2022-2024 iiPython
 
 # Modules
+import re
 import json
 from ..exceptions import InvalidSyntax
 
@@ -8,53 +9,74 @@ from ..exceptions import InvalidSyntax
 block_starts = ["(", "\"", "'", "{"]
 block_ends = [")", "\"", "'", "}"]
 
+# Initialization
+_BOUNDARY = re.compile(r"[ (\"'{]")
+_NESTING = {"(": re.compile(r"[()]"), "{": re.compile(r"[{}]")}
+_CLOSING = dict(zip(block_starts, block_ends))
+
 # Tokenizer
 def tokenize(line: str) -> list:
-    dt = {"mode": None, "depth": 0, "val": "", "tokens": []}
-    for char in line:
-        dt["val"] += char
-        if dt["mode"] is not None and char == block_ends[block_starts.index(dt["mode"])]:
-            if dt["depth"] > 1:
-                dt["depth"] -= 1
-
-            else:
-                if char == block_ends[0]:
-                    dt["tokens"].append(dt["val"])
-                    dt["val"] = ""
-
-                dt["mode"] = None
-                dt["depth"] = 0
-
-        elif char in block_starts:
-            if not dt["depth"]:
-                dt["mode"] = char
-
-            if char == dt["mode"]:
-                dt["depth"] += 1
-
-        elif dt["mode"] is None and char == " ":
-            if dt["val"] == char:
-                dt["val"] = ""
+    tokens, start, index, length = [], 0, 0, len(line)
+    mode, depth = None, 0
+    while index < length:
+        match = _BOUNDARY.search(line, index)
+        if match is None:
+            break
+
+        index = match.start()
+        char = line[index]
+        if char == " ":
+            value = line[start:index]
+            index = start = index + 1
+            if not value:
                 continue  # Skip the space, it's just a seperator
 
-            dt["val"] = dt["val"][:-1]  # :-1 to account for space
-            if dt["val"] == "::":
-                dt["val"] = ""
-                break  # This is an in-line comment
+            elif value == "::":
+                return tokens  # This is an in-line comment
+
+            tokens.append(value)
+            continue
+
+        # Jump straight to the end of this block
+        mode, depth = char, 1
+        if char not in _NESTING:
+            end = line.find(char, index + 1)
+            if end == -1:
+                index = length
+                break
+
+            mode, depth, index = None, 0, end + 1
+            continue
+
+        pattern = _NESTING[char]
+        while depth:
+            match = pattern.search(line, index + 1)
+            if match is None:
+                break
+
+            index = match.start()
+            depth += 1 if line[index] == char else -1
+
+        if depth:
+            index = length
+            break
 
-            dt["tokens"].append(dt["val"])
-            dt["val"] = ""
+        mode, index = None, index + 1
+        if char == "(":
+            tokens.append(line[start:index])
+            start = index
 
-    if dt["val"]:
-        if dt["mode"] is not None:
-            closing_tag = block_ends[block_starts.index(dt["mode"])]
-            if not dt["val"][-1].endswith(closing_tag):
+    value = line[start:]
+    if value:
+        if mode is not None:
+            closing_tag = _CLOSING[mode]
+            if not value[-1].endswith(closing_tag):
                 raise InvalidSyntax(f"expected a closing '{closing_tag}', found nothing.")
 
-        dt["tokens"].append(dt["val"])
-        dt["val"] = ""
+        tokens.append(value)
 
-    if dt["depth"] > 0:
+    if depth > 0:
+        dt = {"mode": mode, "depth": depth, "val": "", "tokens": tokens}
         raise InvalidSyntax(f"unexpected depth value after tokenizing, did you close all open blocks?\nRaw token information: {json.dumps(dt, indent = 4)}")
 
-    return dt["tokens"]
+    return tokens
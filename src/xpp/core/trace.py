@@ -0,0 +1,29 @@
+# Copyright 2024 iiPython
+
+# Modules
+from typing import Any
+
+# Trace event class
+class TraceEvent(object):
+    """
+    x++ Trace Event Class
+    A single event handed to the callbacks installed with Interpreter.set_trace or add_trace.
+    The kind is one of "enter", "exit", "line", "operator" or "return".
+    Exits and returns are sent even when the section or operator raised, with a value of None.
+    """
+    __slots__ = ("kind", "sid", "path", "line", "content", "operator", "value")
+
+    def __init__(
+        self,
+        kind: str,
+        section: object,
+        line: int,
+        content: str,
+        operator: str = None,
+        value: Any = None
+    ) -> None:
+        self.kind, self.sid, self.path = kind, section.sid, section.path
+        self.line, self.content, self.operator, self.value = line, content, operator, value
+
+    def __repr__(self) -> str:
+        return f"<TraceEvent kind='{self.kind}' sid='{self.sid}' line={self.line} operator={self.operator!r}>"
@@ -0,0 +1,198 @@
+# Copyright 2024 iiPython
+
+# Modules
+import io
+import os
+import sys
+import glob
+import json
+import shlex
+import signal
+import statistics
+import traceback
+from time import perf_counter
+from multiprocessing import Pool
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Dict, List, Tuple
+
+from ..core.interpreter import Interpreter
+from ..exceptions import handle_exception
+
+# Initialization
+class JobTimeout(BaseException):
+    pass  # Not an Exception, so nothing inside x++ can catch it
+
+_worker, _timers = {}, hasattr(signal, "setitimer")  # No interval timers on Windows
+
+def _timeout(signum: int, frame: object) -> None:
+    raise JobTimeout
+
+# Worker handling
+def init_worker(options: dict) -> None:
+    """
+    Sets up the interpreter a pool worker reuses for every job it's given.
+    """
+    _worker["options"] = options
+    _worker["interpreter"] = Interpreter("main.xpp", [], **options)
+    if _timers:
+        signal.signal(signal.SIGALRM, _timeout)
+
+def run_job(job: Tuple[int, str, str | None, float]) -> dict:
+    """
+    Runs a single file on this worker's interpreter, capturing its output.
+    Anything fed to `read` comes from the job's input, stdin is never touched.
+    """
+    index, filepath, data, timeout = job
+    interpreter, stdout, stderr = _worker["interpreter"], io.StringIO(), io.StringIO()
+    interpreter.stdin = io.StringIO(data or "")
+
+    status, error, start = "ok", None, perf_counter()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            try:
+                if timeout and _timers:
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+
+                interpreter.run_file(filepath)
+
+            finally:
+                if timeout and _timers:
+                    signal.setitimer(signal.ITIMER_REAL, 0)  # Disarmed before any handler below runs
+
+        except JobTimeout:
+            status, error = "timeout", f"timed out after {timeout} second(s)"
+            print(f"x++ run-many: {error}", file = sys.stderr)
+
+            # The run was cut off at an arbitrary point (possibly halfway through
+            # registering an imported module), so none of its state gets reused
+            _worker["interpreter"] = Interpreter("main.xpp", [], **_worker["options"])
+
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                status, error = "failed", e.code if isinstance(e.code, str) else f"exited with {e.code}"
+                if isinstance(e.code, str):
+                    print(e.code, file = sys.stderr)
+
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            with redirect_stdout(stderr):
+                try:
+                    handle_exception(e, interpreter.stack)
+
+                except Exception:
+                    print(traceback.format_exc(), end = "")  # -D re-raises after printing, so keep the traceback
+
+    return {
+        "index": index,
+        "file": filepath,
+        "input": data,
+        "status": status,
+        "error": error,
+        "time": perf_counter() - start,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue()
+    }
+
+# Handle running
+def expand(patterns: List[str]) -> List[str]:
+    """
+    Expands every pattern into the x++ files it matches, keeping the given order.
+    """
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive = True)) if glob.has_magic(pattern) else [pattern]
+        matches = [match for match in matches if os.path.isfile(match)]
+        if not matches:
+            raise FileNotFoundError(f"no such file: '{pattern}'")
+
+        files += matches
+
+    return files
+
+def read_inputs(filepath: str) -> List[str]:
+    """
+    Reads an inputs file; every non-empty line is one job, and each of its
+    (shell-style quoted) arguments is handed to `read` in order.
+    """
+    with open(filepath, "r") as fh:
+        return ["".join(f"{arg}\n" for arg in shlex.split(line)) for line in fh if line.strip()]
+
+def run_many(
+    files: List[str],
+    inputs: List[str] | None = None,
+    workers: int = None,
+    timeout: float = None,
+    options: dict = None
+) -> List[dict]:
+    """
+    Runs every file (or every file once per input) across a pool of worker processes,
+    returning one result per job in the order the jobs were given.
+    """
+    jobs = [(index, file, data, timeout) for index, (file, data) in enumerate(
+        (file, data) for file in files for data in (inputs if inputs is not None else [None])
+    )]
+    with Pool(workers or os.cpu_count(), initializer = init_worker, initargs = (options or {},)) as pool:
+        results = list(pool.imap_unordered(run_job, jobs))
+
+    return sorted(results, key = lambda result: result["index"])
+
+# Reporting
+def summarize(results: List[dict], workers: int, elapsed: float) -> str:
+    times = [result["time"] for result in results]
+    counts = {status: sum(result["status"] == status for result in results) for status in ("ok", "failed", "timeout")}
+    lines = [
+        f"x++ run-many: {len(results)} job(s) on {workers} worker(s) in {elapsed:.2f} s",
+        f"  {counts['ok']} ok, {counts['failed']} failed, {counts['timeout']} timed out"
+    ]
+    if times:
+        lines.append(f"  job time: median {statistics.median(times) * 1000:.2f} ms, max {max(times) * 1000:.2f} ms")
+
+    for result in results:
+        if result["status"] != "ok":
+            lines.append(f"  {result['status']:<8} {result['file']}" + (f" < {result['input']!r}" if result["input"] else ""))
+
+    return "\n".join(lines)
+
+def main(argv: List[str], values: Dict[str, str]) -> None:
+    """
+    Entry point for `xpp run-many <files...>`.
+    """
+    try:
+        files = expand([a for a in argv if a[0] != "-"])
+        inputs = read_inputs(values["inputs"]) if "inputs" in values else None
+
+    except OSError as e:
+        sys.exit(f"x++ Exception: {e}")
+
+    if not files:
+        sys.exit("x++ Exception: run-many expects at least one file")
+
+    try:
+        workers = int(values.get("workers", os.cpu_count()))
+        timeout = float(values["timeout"]) if "timeout" in values else None
+
+    except ValueError:
+        sys.exit("x++ Exception: --workers and --timeout expect a number")
+
+    if workers < 1:
+        sys.exit("x++ Exception: --workers must be at least 1")
+
+    from ..__main__ import interpreter_options
+    options = interpreter_options(argv, values)
+    started = perf_counter()
+    results = run_many(files, inputs, workers, timeout, options)
+    elapsed = perf_counter() - started
+
+    if "--quiet" not in argv:
+        for result in results:
+            print(f"==> {result['file']}" + (f" < {result['input']!r}" if result["input"] else "") + " <==")
+            print(result["stdout"], end = "")
+            print(result["stderr"], end = "", file = sys.stderr)
+
+    print(summarize(results, workers, elapsed), file = sys.stderr)
+    if "json" in values:
+        with open(values["json"], "w") as fh:
+            fh.write(json.dumps(results, indent = 4))
+
+    if any(result["status"] != "ok" for result in results):
+        sys.exit(1)
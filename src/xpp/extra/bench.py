@@ -0,0 +1,117 @@
+# Copyright 2024 iiPython
+
+# Modules
+import os
+import sys
+import json
+import math
+import platform
+from time import perf_counter
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+from .. import __version__
+from ..core.interpreter import Interpreter
+
+# Statistics
+def _percentile(times: List[float], percent: float) -> float:
+    ordered = sorted(times)
+    return ordered[max(math.ceil(len(ordered) * percent / 100) - 1, 0)]
+
+# Handle running
+def run_once(filepath: str, trace: Callable = None) -> float:
+    interpreter = Interpreter(filepath, [], use_cache = False)
+    if trace is not None:
+        interpreter.set_trace(trace)
+
+    with open(os.devnull, "w") as null, redirect_stdout(null):
+        start = perf_counter()
+        interpreter.load_file(filepath)
+        interpreter.run_section("main")
+        return perf_counter() - start
+
+def count_operators(filepath: str) -> int:
+    events = []
+    run_once(filepath, lambda event: event.kind == "operator" and events.append(None))
+    return len(events)
+
+def run_benchmark(filepath: str, warmup: int = 1, repeat: int = 5) -> Dict[str, float | int | List[float]]:
+    """
+    Runs a single x++ program with its output discarded, returning timing statistics.
+    Operators are counted in a separate traced run so the timed runs aren't slowed down.
+    """
+    for _ in range(warmup):
+        run_once(filepath)
+
+    times = [run_once(filepath) for _ in range(repeat)]
+    median, operators = _percentile(times, 50), count_operators(filepath)
+    return {
+        "median": median,
+        "p95": _percentile(times, 95),
+        "min": min(times),
+        "operators": operators,
+        "ops_per_sec": operators / median if median else 0.0,
+        "times": times
+    }
+
+def run_suite(location: str, warmup: int = 1, repeat: int = 5) -> dict:
+    """
+    Runs every x++ program in a directory; files starting with an underscore are
+    treated as helper packages and skipped.
+    """
+    files = sorted(
+        file for file in os.listdir(location)
+        if file.endswith(".xpp") and not file.startswith("_")
+    )
+    results = {}
+    for file in files:
+        results[file.removesuffix(".xpp")] = run_benchmark(os.path.join(location, file), warmup, repeat)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "benchmarks": results
+    }
+
+# Reporting
+def report(results: dict, baseline: dict = None) -> str:
+    lines = [f"{'benchmark':<16}{'median ms':>12}{'p95 ms':>12}{'ops/sec':>14}" + (f"{'change':>10}" if baseline else "")]
+    for name, result in results["benchmarks"].items():
+        line = f"{name:<16}{result['median'] * 1000:>12.2f}{result['p95'] * 1000:>12.2f}{result['ops_per_sec']:>14.0f}"
+        if baseline:
+            previous = baseline["benchmarks"].get(name)
+            line += f"{(result['median'] / previous['median'] - 1) * 100:>+9.1f}%" if previous else f"{'new':>10}"
+
+        lines.append(line)
+
+    return "\n".join(lines)
+
+def main(argv: List[str], values: Dict[str, str]) -> None:
+    """
+    Entry point for `xpp bench [directory]`; the directory defaults to ./benchmarks.
+    """
+    location = ([a for a in argv if a[0] != "-"] or ["benchmarks"])[-1]
+    if not os.path.isdir(location):
+        sys.exit(f"x++ Exception: no such benchmark directory: '{location}'")
+
+    try:
+        warmup, repeat = int(values.get("warmup", 1)), int(values.get("repeat", 5))
+
+    except ValueError:
+        sys.exit("x++ Exception: --warmup and --repeat expect a number of runs")
+
+    if repeat < 1:
+        sys.exit("x++ Exception: --repeat must be at least 1")
+
+    baseline = None
+    if "compare" in values:
+        with open(values["compare"], "r") as fh:
+            baseline = json.loads(fh.read())
+
+    results = run_suite(location, warmup, repeat)
+    print(report(results, baseline))
+    if "json" in values:
+        with open(values["json"], "w") as fh:
+            fh.write(json.dumps(results, indent = 4))
@@ -2,11 +2,11 @@
 
 # Modules
 import os
-import json
 
 # Initialization
 config = {}
 if os.path.isfile(".xconfig"):
+    import json  # Only imported when there's something to parse
     try:
         with open(".xconfig", "r") as f:
             config = json.loads(f.read())
@@ -0,0 +1,120 @@
+# Copyright 2024 iiPython
+
+# Modules
+from time import perf_counter
+from typing import List
+
+from ..core.trace import TraceEvent
+
+# Profiler class
+class Profiler(object):
+    """
+    x++ Profiler Class
+    Deterministically times every section call and instruction of an interpreter,
+    attributing instruction time to its operator and the x++ line that was running.
+    """
+    def __init__(self, interpreter: object) -> None:
+        self.interpreter = interpreter
+        self.sections, self.lines, self.operators, self.stacks = {}, {}, {}, {}
+        self.total = 0.0
+
+        # Running state
+        self._sections, self._operators, self._path, self._running = [], [], [], {}
+
+    def attach(self) -> None:
+        """
+        Starts timing through the interpreter's trace hook.
+        Instructions are timed as a whole, so argument evaluation counts towards their line.
+        """
+        self.interpreter.add_trace(self.event)
+
+    def detach(self) -> None:
+        self.interpreter.remove_trace(self.event)
+
+    def event(self, event: TraceEvent) -> None:
+        match event.kind:
+            case "enter":
+                self._path.append(event.sid)
+                self._sections.append([len(self._operators), 0.0, perf_counter()])
+
+            case "exit":
+                self.exit_section(perf_counter())
+
+            case "operator":
+                section = self.interpreter.stack[-1]
+                line = (section.sid, section.current_line, section.line_content)
+                top = not self._sections or len(self._operators) == self._sections[-1][0]
+
+                self._running[event.operator] = self._running.get(event.operator, 0) + 1
+                self._operators.append([0.0, line, top, perf_counter()])
+
+            case "return":
+                self.exit_operator(perf_counter(), event.operator)
+
+    def exit_section(self, now: float) -> None:
+        sid = self._path[-1]
+        _, children, start = self._sections.pop()
+        elapsed = now - start
+        if self._sections:
+            self._sections[-1][1] += elapsed
+
+        else:
+            self.total += elapsed
+
+        stats = self.sections.setdefault(sid, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed * (sid not in self._path[:-1])  # Recursive calls are already inside the outer one
+        stats[2] += elapsed - children
+
+        path = ";".join(self._path)
+        self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - children
+        self._path.pop()
+
+    def exit_operator(self, now: float, name: str) -> None:
+        children, line, top, start = self._operators.pop()
+        elapsed = now - start
+        exclusive = elapsed - children
+        if self._operators:
+            self._operators[-1][0] += elapsed
+
+        self._running[name] -= 1
+        stats = self.operators.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed * (not self._running[name])  # Only count the outermost of nested calls
+        stats[2] += exclusive
+
+        stats = self.lines.setdefault(line, [0, 0.0])
+        stats[0] += top
+        stats[1] += exclusive
+
+    # Reporting
+    def report(self) -> str:
+        lines = [f"x++ profile, {self.total * 1000:.3f} ms total", "", "Sections:"]
+        lines.append(f"  {'calls':>8}  {'total ms':>10}  {'self ms':>10}  section")
+        for sid, (calls, inclusive, exclusive) in sorted(self.sections.items(), key = lambda i: -i[1][2]):
+            lines.append(f"  {calls:>8}  {inclusive * 1000:>10.3f}  {exclusive * 1000:>10.3f}  {sid}")
+
+        lines += ["", "Lines:", f"  {'calls':>8}  {'self ms':>10}  location"]
+        for (sid, lno, content), (calls, exclusive) in sorted(self.lines.items(), key = lambda i: -i[1][1]):
+            lines.append(f"  {calls:>8}  {exclusive * 1000:>10.3f}  {sid}:{lno}  {content}")
+
+        lines += ["", "Operators:", f"  {'calls':>8}  {'total ms':>10}  {'self ms':>10}  operator"]
+        for name, (calls, inclusive, exclusive) in sorted(self.operators.items(), key = lambda i: -i[1][2]):
+            lines.append(f"  {calls:>8}  {inclusive * 1000:>10.3f}  {exclusive * 1000:>10.3f}  {name}")
+
+        return "\n".join(lines) + "\n"
+
+    def collapsed(self) -> str:
+        """
+        Returns the section call stacks in the collapsed format used by flame graph tools,
+        weighted by self time in microseconds.
+        """
+        return "".join(f"{path} {round(elapsed * 1_000_000)}\n" for path, elapsed in self.stacks.items())
+
+    def write(self, prefix: str) -> List[str]:
+        paths = [f"{prefix}.profile.txt", f"{prefix}.folded"]
+        for path, content in zip(paths, [self.report(), self.collapsed()]):
+            with open(path, "w") as fh:
+                fh.write(content)
+
+        return paths
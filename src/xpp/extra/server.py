@@ -0,0 +1,216 @@
+# Copyright 2024 iiPython
+
+# Modules
+import os
+import sys
+import socket
+from time import perf_counter
+from collections.abc import Callable  # typing costs the client a few milliseconds
+
+import xpp
+from .config import config
+
+# Initialization
+# Requests are "<length>\n" followed by the NUL separated cwd and argv, and the worker
+# answers with its exit code on a single line; both ends stay clear of json's import cost.
+def default_socket() -> str:
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], f"xpp-{os.getuid()}.sock")
+
+    # Shared temp folders get a private folder of their own, see serve()
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", f"xpp-{os.getuid()}", "xpp.sock")
+
+def _safe_directory(directory: str) -> bool:
+    """
+    Checks that nobody but the current user (or root) can swap out files inside a folder.
+    Shared folders like /tmp are fine as long as they're sticky.
+    """
+    stat = os.stat(directory)
+    return stat.st_uid in (os.getuid(), 0) and (not stat.st_mode & 0o022 or bool(stat.st_mode & 0o1000))
+
+def _owned(connection: socket.socket, path: str) -> bool:
+    """
+    Checks that the server on the other end of a connection runs as the current user.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        import struct
+        _, uid, _ = struct.unpack("3i", connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+        return uid == os.getuid()
+
+    # No peer credentials here, so trust the socket file instead
+    return os.lstat(path).st_uid == os.getuid() and _safe_directory(os.path.dirname(os.path.abspath(path)))
+
+def _exit_code(code: int | str | None) -> int:
+    if code is None:
+        return 0
+
+    elif isinstance(code, str):
+        print(code, file = sys.stderr)
+        return 1
+
+    return code
+
+# Server
+def preload() -> None:
+    """
+    Imports everything a run could need and parses the installed packages up front, so forked workers start warm.
+    """
+    from ..modules.ops import opmap
+    from ..modules.ops.stdlib.import_ import search_locations
+    from ..core import engine, jit  # noqa: F401
+    from ..core.sections import preload_file
+
+    for operator in opmap.values():
+        operator.load()
+
+    # Parse every installed package, workers only check they haven't changed
+    for location in search_locations():
+        for root, _, files in os.walk(location):
+            for file in files:
+                if not file.endswith(".xpp"):
+                    continue
+
+                try:
+                    preload_file(os.path.join(root, file))
+
+                except Exception:
+                    continue  # Broken packages fail once they're actually imported
+
+def handle(connection: socket.socket, run: Callable[[], None]) -> None:
+    """
+    Runs a single client request inside a freshly forked worker.
+    The client's stdin, stdout and stderr are passed over the socket, so output streams straight to it.
+    """
+    data, fds, _, _ = socket.recv_fds(connection, 1 << 16, 3)
+    while b"\n" not in data:
+        data += connection.recv(1 << 16) or b"\n"
+
+    length, data = data.split(b"\n", 1)
+    while len(data) < int(length or 0):
+        chunk = connection.recv(1 << 16)
+        if not chunk:
+            return
+
+        data += chunk
+
+    xpp.import_started = perf_counter()  # Nothing gets imported, the worker is already warm
+    cwd, *argv = data.decode().split("\0")
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    # Match the client's environment
+    os.chdir(cwd)
+    sys.argv = ["xpp"] + argv
+    config.clear()
+    if os.path.isfile(".xconfig"):
+        import json
+        try:
+            with open(".xconfig", "r") as fh:
+                config.update(json.loads(fh.read()))
+
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    try:
+        run()
+        code = 0
+
+    except SystemExit as e:
+        code = _exit_code(e.code)
+
+    except BaseException as e:
+        print(f"x++ server: {type(e).__name__}: {e}", file = sys.stderr)
+        code = 1
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    connection.sendall(f"{code}\n".encode())
+
+def serve(path: str, run: Callable[[], None]) -> None:
+    """
+    Listens on a Unix socket, forking a worker with its own interpreter for every connection.
+    """
+    import stat
+    import signal
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode = 0o700, exist_ok = True)
+    if not _safe_directory(directory):
+        sys.exit(f"x++ Exception: refusing to serve from '{directory}', other users can write to it")
+
+    elif os.path.lexists(path):
+        info = os.lstat(path)
+        if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+            sys.exit(f"x++ Exception: '{path}' exists and isn't a socket owned by you")
+
+        os.unlink(path)
+
+    preload()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)  # Only the current user may connect
+    server.bind(path)
+    os.umask(umask)
+    server.listen(64)
+
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # Workers are reaped automatically
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Clean up the socket when terminated
+    print(f"x++ server listening on {path}", file = sys.stderr)
+    try:
+        while True:
+            connection, _ = server.accept()
+            if os.fork() == 0:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                server.close()
+                try:
+                    handle(connection, run)
+
+                finally:
+                    os._exit(0)
+
+            connection.close()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.close()
+        os.unlink(path)
+
+# Client
+def client(path: str, argv: list[str]) -> int | None:
+    """
+    Runs a script on a warm server, returning its exit code.
+    Returns None if no server (run by the current user) is listening, so the caller can run it locally instead.
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+
+    except OSError:
+        return None
+
+    # The client's terminal is handed over, so make sure it goes to our own server
+    if not _owned(connection, path):
+        print(f"x++ client: '{path}' isn't served by you, running locally", file = sys.stderr)
+        connection.close()
+        return None
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    request = "\0".join([os.getcwd()] + argv).encode()
+    socket.send_fds(connection, [f"{len(request)}\n".encode() + request], [0, 1, 2])
+
+    response = connection.makefile("rb").readline()
+    connection.close()
+    return int(response) if response.strip().lstrip(b"-").isdigit() else 1
+
+def run_client(argv: list[str]) -> None:
+    """
+    Handles `xpp --client`, exiting with the script's exit code once a server has run it.
+    """
+    path = ([a.split("=", 1)[1] for a in argv if a.startswith("--socket=")] or [default_socket()])[-1]
+    code = client(path, [a for a in argv if a != "--client" and not a.startswith("--socket=")])
+    if code is not None:
+        sys.exit(code)
@@ -3,9 +3,8 @@
 
 # Modules
 import os
-from importlib.util import (
-    module_from_spec, spec_from_file_location
-)
+from typing import Any, Callable
+from importlib import import_module
 
 # Class handler
 def generate_opmap(ops) -> dict:
@@ -23,6 +22,7 @@ supported_opmaps = [
 ]
 
 def import_opmap_from_file(ns: str, fp: str) -> dict:
+    from importlib.util import module_from_spec, spec_from_file_location  # Only needed for Python packages
 
     # Load operators
     spec = spec_from_file_location(f"{ns}_{fp.split(os.sep)[-1][:-3]}", fp)
@@ -40,15 +40,58 @@ def import_opmap_from_file(ns: str, fp: str) -> dict:
     del spec, module
     return opmap
 
-# Initialization
-opmap = {}
-for path, _, files in os.walk(os.path.abspath(os.path.dirname(__file__))):
-    if "__pycache__" in path:
-        continue
-
-    for file in files:
-        fp = os.path.join(path, file)
-        if file[0] == "_" or not os.path.isfile(fp) or not file[-3:] == ".py":
+# Lazy operators
+class LazyOperator(object):
+    """
+    x++ Lazy Operator Class
+    Stands in for a standard library operator until it's first compiled,
+    so only the stdlib modules a script actually uses get imported.
+    """
+    __slots__ = ("name", "module", "operator")
+
+    def __init__(self, name: str, module: str) -> None:
+        self.name, self.module, self.operator = name, module, None
+
+    def __repr__(self) -> str:
+        return f"<LazyOperator name='{self.name}' module='{self.module}'>"
+
+    def __call__(self, mem, args: list) -> Any:
+        return self.load()(mem, args)
+
+    def load(self) -> Callable:
+        if self.operator is None:
+            module = import_module(f"{__name__}.stdlib.{self.module}")
+            self.operator = generate_opmap(module.XOperators)[self.name]
+
+        return self.operator
+
+def generate_registry() -> dict:
+    """
+    Rebuilds the static registry below by importing every stdlib module.
+    Run `python -c "from xpp.modules.ops import generate_registry; print(generate_registry())"`
+    after adding or renaming an operator.
+    """
+    registry = {}
+    for file in sorted(os.listdir(os.path.join(os.path.dirname(__file__), "stdlib"))):
+        if file[0] == "_" or file[-3:] != ".py":
             continue
 
-        opmap = opmap | import_opmap_from_file("xpp", fp)
+        module = import_module(f"{__name__}.stdlib.{file[:-3]}")
+        registry |= {name: file[:-3] for name in generate_opmap(module.XOperators)}
+
+    return registry
+
+# Initialization
+registry = {
+    "load": "fileio", "save": "fileio",
+    "imp": "import_",
+    "evl": "internal", "if": "internal", "jmp": "internal", "rem": "internal", "rep": "internal",
+    "ret": "internal", "try": "internal", "var": "internal", "whl": "internal",
+    "add": "math", "dec": "math", "div": "math", "inc": "math", "mul": "math",
+    "pow": "math", "rnd": "math", "rng": "math", "sub": "math",
+    "get": "objects", "new": "objects", "pop": "objects", "psh": "objects", "set": "objects",
+    "cls": "stdio", "exit": "stdio", "prt": "stdio", "read": "stdio", "thrw": "stdio", "wait": "stdio",
+    "chr": "strman", "flt": "strman", "idx": "strman", "int": "strman", "len": "strman",
+    "lwr": "strman", "str": "strman", "upr": "strman"
+}
+opmap = {name: LazyOperator(name, module) for name, module in registry.items()}
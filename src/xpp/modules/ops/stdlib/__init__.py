@@ -0,0 +1,2 @@
+# Copyright 2022-2024 iiPython
+# x++ standard library operators
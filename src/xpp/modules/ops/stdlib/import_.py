@@ -3,20 +3,22 @@
 # Modules
 import os
 import json
-from pathlib import Path
 from copy import copy as copyobj
 
-from xpp import config, load_sections
+from xpp import config
 from xpp.exceptions import BrokenPackage
 from xpp.modules.ops import import_opmap_from_file
 from xpp.modules.ops.shared import ensure_arguments, InvalidArgument
 
 # Initialization
-search_locations = [
-    str(Path(__file__).parents[4] / "pkgs"),  # Global pkgs folder (assuming module install)
-    str(Path("pkgs").absolute())  # Local pkgs folder (relative to cwd)
-]
-main_namespace = config.get("main", "main").split(os.sep)[-1].removesuffix(".xpp")
+def search_locations() -> list:
+    return [
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../pkgs")),  # Global pkgs folder (assuming module install)
+        os.path.abspath("pkgs")  # Local pkgs folder (relative to cwd)
+    ]
+
+def main_namespace() -> str:
+    return config.get("main", "main").split(os.sep)[-1].removesuffix(".xpp")  # Workers of 'xpp serve' reload the config
 
 # Operators class
 class XOperators:
@@ -49,7 +51,7 @@ class XOperators:
             module_location = os.path.dirname(mem.interpreter.stack[-1].path)
 
         else:
-            for location in search_locations:
+            for location in search_locations():
                 module_location = os.path.join(location, module.split(".")[0])
                 if os.path.isdir(module_location):
                     location = None
@@ -113,11 +115,8 @@ class XOperators:
             if not os.path.isfile(path):
                 continue
 
-            with open(path, "r") as fh:
-                source = fh.read()
-
             # Load to RAM
-            mem.interpreter.sections += load_sections(source, path, namespace)
+            mem.interpreter.load_file(path, namespace)
             mem.interpreter.run_section(f"{namespace}.main")
             loaded = True
             break
@@ -68,9 +68,11 @@ class XOperators:
         elif not isinstance(ain[1].value, str):
             raise InvalidArgument("rep: expression must be a string!")
 
+        body = mem.interpreter.compile(ain[1].value).call
         for _ in range(ain[0].value):
-            result = mem.interpreter.execute(ain[1].value)
+            result = body()
 
+        mem.interpreter.count_iterations(ain[0].value)
         [out.set(result) for out in aout]
         return result
 
@@ -94,6 +96,12 @@ class XOperators:
         if not isinstance(ain[1].value, str):
             raise InvalidArgument("whl: branch must be a string!")
 
+        # Compile the condition and body once, rather than on every iteration
+        refresh, body = ain[0].compile(), mem.interpreter.compile(ain[1].value).call
+        iterations = 0
         while ain[0].value:
-            mem.interpreter.execute(ain[1].value)
-            ain[0].refresh()
+            body()
+            refresh()
+            iterations += 1
+
+        mem.interpreter.count_iterations(iterations)
@@ -3,7 +3,6 @@
 # Modules
 import operator
 from typing import List
-from random import randint
 from types import FunctionType
 
 from xpp.core.datastore import Datastore
@@ -110,6 +109,7 @@ class XOperators:
         if any([not isinstance(x.value, int) for x in ain]):
             raise InvalidArgument("rng: min and max must both be integers!")
 
+        from random import randint  # Only pay for importing random when it's used
         val = randint(ain[0].value, ain[1].value)
         [out.set(val) for out in aout]
         return val
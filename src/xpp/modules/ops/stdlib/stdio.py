@@ -8,23 +8,36 @@ from xpp.modules.ops.shared import (
     fetch_io_args, InvalidArgument
 )
 
+# Initialization
+def read_line(interpreter: object, prompt: str) -> str:
+    if interpreter.stdin is None:
+        return input(prompt)
+
+    # Behave like input() on whatever stdin the interpreter was given
+    print(prompt, end = "", file = interpreter.stdout, flush = True)
+    line = interpreter.stdin.readline()
+    if not line:
+        raise EOFError("EOF when reading a line")
+
+    return line.removesuffix("\n")
+
 # Operators class
 class XOperators:
     overrides = {"exit_": "exit"}
 
     # Handlers
     def cls(mem, args: list) -> None:
-        print("\033c\033[3J", end = "")
+        print("\033c\033[3J", end = "", file = mem.interpreter.stdout)
 
     def exit_(mem, args: list) -> None:
         sys.exit(args[0].value if args else 0)
 
     def prt(mem, args: list) -> None:
-        print(*[v.value for v in args])
+        print(*[v.value for v in args], file = mem.interpreter.stdout)
 
     def read(mem, args: list) -> None:
         ain, aout = fetch_io_args("read", "read [prompt] [?output]", [], args)
-        res = input(str(ain[0].value) if ain else "")
+        res = read_line(mem.interpreter, str(ain[0].value) if ain else "")
         [out.set(res) for out in aout]
 
     def thrw(mem, args: list) -> None:
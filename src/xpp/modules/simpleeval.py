@@ -101,6 +101,8 @@ import operator as op
 import sys
 import warnings
 
+from ..core.cache import LRUCache
+
 ########################################
 # Module wide 'globals'
 
@@ -249,6 +251,9 @@ DEFAULT_NAMES = {"true": True, "false": False, "null": None}
 
 ATTR_INDEX_FALLBACK = True
 
+# How many parsed expressions simple_eval() keeps around
+EXPRESSION_CACHE_SIZE = 4096
+
 
 ########################################
 # And the actual evaluator:
@@ -412,7 +417,174 @@ class SimpleEval(object):  # pylint: disable=too-few-public-methods
         except KeyError:
             raise NameNotDefined(node.id, self.expr)
 
+########################################
+# And the expression compiler:
+
+
+def _raiser(error):
+    """return a closure raising a freshly built error each time it's called"""
+
+    def raise_error(names):
+        raise error()
+
+    return raise_error
+
+
+class ExpressionCompiler(object):  # pylint: disable=too-few-public-methods
+    """Turns a parsed node tree into a chain of closures that take the names
+    to evaluate against, behaving exactly like SimpleEval would. Anything
+    SimpleEval refuses to evaluate becomes a closure raising the same error.
+    >>> ExpressionCompiler("a + 1").compile(SimpleEval.parse("a + 1"))({"a": 1})
+    2
+    """
+
+    def __init__(self, expr, operators=None):
+        self.expr = expr
+        self.operators = DEFAULT_OPERATORS if operators is None else operators
+        self.nodes = {
+            ast.Expr: self._compile_expr,
+            ast.Name: self._compile_name,
+            ast.UnaryOp: self._compile_unaryop,
+            ast.BinOp: self._compile_binop,
+            ast.BoolOp: self._compile_boolop,
+            ast.Compare: self._compile_compare,
+            ast.Constant: self._compile_constant
+        }
+
+    def compile(self, node):
+        try:
+            handler = self.nodes[type(node)]
+        except KeyError:
+            return _raiser(InvalidExpression)
+
+        return handler(node)
+
+    def _compile_expr(self, node):
+        return self.compile(node.value)
+
+    @staticmethod
+    def _compile_constant(node):
+        value = node.value
+        if hasattr(value, "__len__") and len(value) > MAX_STRING_LENGTH:
+            return _raiser(lambda: IterableTooLong(
+                "Literal in statement is too long!"
+                " ({0}, when {1} is max)".format(len(value), MAX_STRING_LENGTH)
+            ))
+
+        return lambda names: value
+
+    def _compile_name(self, node):
+        name, expr = node.id, self.expr
+
+        def load(names):
+            try:
+                return names[name]
+            except KeyError:
+                raise NameNotDefined(name, expr)
+
+        return load
+
+    def _compile_unaryop(self, node):
+        try:
+            operator = self.operators[type(node.op)]
+        except KeyError:
+            return _raiser(lambda: OperatorNotDefined(node.op, self.expr))
+
+        operand = self.compile(node.operand)
+        return lambda names: operator(operand(names))
+
+    def _compile_binop(self, node):
+        try:
+            operator = self.operators[type(node.op)]
+        except KeyError:
+            return _raiser(lambda: OperatorNotDefined(node.op, self.expr))
+
+        left, right = self.compile(node.left), self.compile(node.right)
+        return lambda names: operator(left(names), right(names))
+
+    def _compile_boolop(self, node):
+        values = [self.compile(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def and_(names):
+                for value in values:
+                    to_return = value(names)
+                    if not to_return:
+                        break
+                return to_return
+
+            return and_
+
+        def or_(names):
+            for value in values:
+                to_return = value(names)
+                if to_return:
+                    break
+            return to_return
+
+        return or_
+
+    def _lookup_compare(self, operation):
+        try:
+            return self.operators[type(operation)]
+        except KeyError:
+            def missing(left, right):
+                raise KeyError(type(operation))
+
+            return missing
+
+    def _compile_compare(self, node):
+        left = self.compile(node.left)
+        comparisons = [
+            (self._lookup_compare(operation), self.compile(comp))
+            for operation, comp in zip(node.ops, node.comparators)
+        ]
+        if len(comparisons) == 1:
+            operator, right = comparisons[0]
+            return lambda names: operator(left(names), right(names))
+
+        def compare(names):
+            right = left(names)
+            to_return = True
+            for operator, comp in comparisons:
+                if not to_return:
+                    break
+                left_value, right = right, comp(names)
+                to_return = operator(left_value, right)
+            return to_return
+
+        return compare
+
+
+def compile_expression(expr):
+    """parse an expression and compile it, returning both the node tree
+    and the resulting closure"""
+
+    node = SimpleEval.parse(expr)
+    return node, ExpressionCompiler(expr).compile(node)
+
+
+########################################
+# Shared evaluator and compiled expression cache:
+
+expression_cache = LRUCache(EXPRESSION_CACHE_SIZE)
+_evaluator = SimpleEval(names=DEFAULT_NAMES)
+
+
 def simple_eval(expr, names=None):
-    """Simply evaluate an expresssion"""
-    s = SimpleEval(names=names)
-    return s.eval(expr)
+    """Simply evaluate an expresssion, reusing the compiled form of any
+    expression that has been evaluated before."""
+    node, function = expression_cache.get(expr, compile_expression)
+    if names is None:
+        names = DEFAULT_NAMES
+
+    if hasattr(names, "__getitem__"):
+        return function(names)
+
+    # Keep the previous state around in case of nested evaluation
+    previous = _evaluator.names, _evaluator.expr
+    _evaluator.names = names
+    try:
+        return _evaluator.eval(expr, node)
+
+    finally:
+        _evaluator.names, _evaluator.expr = previous